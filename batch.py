@@ -0,0 +1,185 @@
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from puzzle import Puzzle, PuzzleSpec, HEURISTICS, DEFAULT_SPEC
+from search import Search, ALGORITHMS
+
+# Heuristics loaded once per worker process, by name and spec.
+_loadedHeuristics = {}
+
+# Solution caches opened once per worker process, by path.
+_openCaches = {}
+
+def getHeuristic(name, spec=DEFAULT_SPEC):
+    """Return the heuristic called `name`: one of puzzle.HEURISTICS,
+    'patternDatabase', whose tables for the spec are memory-mapped the
+    first time they are used, or 'walkingDistance', whose tables are read
+    (or built) the first time."""
+    if (name, spec) not in _loadedHeuristics:
+        if name == 'patternDatabase':
+            from patterndb import PatternDatabase
+            _loadedHeuristics[name, spec] = PatternDatabase.load(spec=spec)
+        elif name == 'walkingDistance':
+            from walkingdistance import WalkingDistance
+            _loadedHeuristics[name, spec] = WalkingDistance.loadOrBuild(spec=spec)
+        else:
+            _loadedHeuristics[name, spec] = HEURISTICS[name]
+    return _loadedHeuristics[name, spec]
+
+def getCache(path):
+    """Return this worker's SolutionCache on the SQLite file at `path`, so
+    every worker shares what the others have solved."""
+    if path not in _openCaches:
+        from cache import SolutionCache
+        _openCaches[path] = SolutionCache(path=path)
+    return _openCaches[path]
+
+def getSpec(board):
+    """Return the spec of a board from its number of tiles, so one batch can
+    mix board sizes. Anything that is not a square number of tiles gets the
+    default spec, which validation then rejects."""
+    try:
+        size = math.isqrt(len(board))
+    except TypeError:
+        return DEFAULT_SPEC
+    if size < 2 or size * size != len(board):
+        return DEFAULT_SPEC
+    return PuzzleSpec.ofSize(size)
+
+def parseJSONLine(line, lineNumber):
+    """Return (id, board) from a JSONL line holding either a list of tiles or
+    an object with a "board" list and an optional "id"."""
+    record = json.loads(line)
+    if isinstance(record, dict):
+        return record.get('id', lineNumber), record['board']
+    return lineNumber, record
+
+def parseCSVRow(row, lineNumber):
+    """Return (id, board) from a CSV row of tiles, optionally preceded by an id."""
+    if math.isqrt(len(row)) ** 2 != len(row):  # A square number of tiles has no id.
+        return row[0], [int(tile) for tile in row[1:]]
+    return lineNumber, [int(tile) for tile in row]
+
+def readBoards(stream, fmt):
+    """Yield (id, board, error) for every board in a JSONL or CSV stream,
+    reading one line at a time. Lines that cannot be parsed or do not hold a
+    valid board give an error."""
+    if fmt == 'csv':
+        rows = csv.reader(stream)
+        parse = parseCSVRow
+    else:
+        rows = (line for line in stream)
+        parse = parseJSONLine
+    for lineNumber, row in enumerate(rows, 1):
+        if not row or (fmt != 'csv' and not row.strip()):
+            continue  # Skip blank lines.
+        try:
+            boardId, board = parse(row, lineNumber)
+        except (ValueError, KeyError, TypeError) as error:
+            if fmt == 'csv' and lineNumber == 1:
+                continue  # A header row.
+            yield lineNumber, None, f'Cannot parse line {lineNumber}: {error}'
+            continue
+        try:
+            board = Puzzle.validateBoard(board, getSpec(board))  # Bad boards never reach a worker.
+        except ValueError as error:
+            yield boardId, board, f'Invalid board on line {lineNumber}: {error}'
+            continue
+        yield boardId, board, None
+
+def solveChunk(chunk, algorithm, heuristicName, timeout, cachePath=None):
+    """Solve every (id, board, error) in a chunk and return the output records,
+    looking each board up in the solution cache at cachePath first if one
+    is given. Runs in a worker process."""
+    solve = getCache(cachePath).solve if cachePath else Search.solve
+    records = []
+    for boardId, board, error in chunk:
+        record = {'id': boardId, 'board': board}
+        if error is None:
+            try:
+                spec = getSpec(board)
+                heuristic = getHeuristic(heuristicName, spec) if ALGORITHMS[algorithm][1] else None
+                result = solve(list(board), algorithm, heuristic, timeout, spec)
+                record.update(result._asdict())
+            except (ValueError, IndexError, KeyError, TypeError, OSError) as exception:
+                error = f'Cannot solve board: {exception}'
+        if error is not None:
+            record['error'] = error
+        records.append(record)
+    return records
+
+def chunked(items, size):
+    """Yield lists of up to `size` items from an iterable, without reading ahead."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def runBatch(boards, output, algorithm='astar', heuristicName='manhattanDistance', timeout=10,
+             workers=None, chunkSize=16, maxPending=None, cachePath=None):
+    """Solve the (id, board, error) items of `boards` on a process pool and
+    write one JSON line per board to `output` as soon as its chunk finishes.
+    At most maxPending chunks are queued at a time, so memory stays flat
+    however long the input is. Boards already in the SQLite solution cache
+    at cachePath are not searched again. Returns the number of records
+    written."""
+    workers = workers or os.cpu_count() or 1
+    maxPending = maxPending or 2 * workers  # Enough to keep every worker busy.
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in chunked(boards, chunkSize):
+            if len(pending) >= maxPending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                written += writeRecords(done, output)
+            pending.add(pool.submit(solveChunk, chunk, algorithm, heuristicName, timeout, cachePath))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            written += writeRecords(done, output)
+    return written
+
+def writeRecords(futures, output):
+    """Write the records of finished chunks as JSON lines."""
+    written = 0
+    for future in futures:
+        for record in future.result():
+            output.write(json.dumps(record) + '\n')
+            written += 1
+    output.flush()
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve many puzzles from a JSONL or CSV file on a process pool.')
+    parser.add_argument('input', nargs='?', default='-', help='JSONL or CSV file of boards, or - for stdin (default).')
+    parser.add_argument('-o', '--output', default='-', help='JSONL file for the results, or - for stdout (default).')
+    parser.add_argument('-f', '--format', choices=('jsonl', 'csv'), help='Input format (default: from the file extension, else jsonl).')
+    parser.add_argument('-a', '--algorithm', choices=sorted(ALGORITHMS), default='astar')
+    parser.add_argument('-H', '--heuristic', choices=sorted(HEURISTICS) + ['patternDatabase', 'walkingDistance'], default='manhattanDistance')
+    parser.add_argument('-t', '--timeout', type=float, default=10, help='Seconds allowed per board (default: 10).')
+    parser.add_argument('-w', '--workers', type=int, help='Worker processes (default: one per CPU).')
+    parser.add_argument('-c', '--chunk-size', type=int, default=16, help='Boards sent to a worker at once (default: 16).')
+    parser.add_argument('--cache', metavar='FILE', help='SQLite file of solutions to reuse and extend across runs.')
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('csv' if args.input.endswith('.csv') else 'jsonl')
+    source = sys.stdin if args.input == '-' else open(args.input, newline='')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        runBatch(readBoards(source, fmt), output, args.algorithm, args.heuristic, args.timeout,
+                 args.workers, args.chunk_size, cachePath=args.cache)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import argparse
+import json
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from puzzle import Puzzle, PuzzleSpec, HEURISTICS, SIZE, DEFAULT_SPEC
+from search import Search, ALGORITHMS
+from batch import getHeuristic
+
+try:
+    import resource  # Peak memory of a run; not available on Windows.
+except ImportError:
+    resource = None
+
+FORMAT_VERSION = 1  # Bump when the layout of the instance or result files changes.
+UNIFORM_SAMPLE = 1000  # Uniform boards whose lower bounds are checked against the buckets before generating.
+
+def uniformBoard(rng, spec=DEFAULT_SPEC):
+    """Return a uniformly random solvable board."""
+    board = list(range(spec.cells))
+    rng.shuffle(board)
+    if not Puzzle.isSolvable(board, spec):
+        board[0], board[1] = board[1], board[0]  # Swap two tiles to fix the parity.
+        if not Puzzle.isSolvable(board, spec):
+            board[0], board[1] = board[1], board[0]
+            board[-1], board[-2] = board[-2], board[-1]
+    return board
+
+def generateInstances(seed, depths, count, uniform=False, timeout=60, spec=DEFAULT_SPEC):
+    """Return a reproducible list of instances, `count` per depth bucket.
+    Bucket i holds boards whose optimal solution length is in
+    [depths[i], depths[i + 1]); the last bucket is [depths[-1], depths[-1] + 10).
+    Boards come from random walks from the solved board, or from uniformly
+    random solvable permutations when `uniform` is set (as in Korf's 100
+    instances). Optimal lengths are found with IDA* and linear conflict;
+    boards it cannot solve within `timeout` seconds are skipped, so some
+    buckets may come back short (see unfilledBuckets). With `uniform`, a
+    bucket that too few of the boards tried could fall in, going by the
+    lower bounds of UNIFORM_SAMPLE boards, raises ValueError at once."""
+    rng = random.Random(seed)
+    bounds = list(depths) + [depths[-1] + 10]
+    maxAttempts = 100 * count * len(depths)
+    if uniform:
+        sampler = random.Random(seed)
+        estimates = [Puzzle.linearConflict(uniformBoard(sampler, spec), spec) for _ in range(UNIFORM_SAMPLE)]
+        shallow = [depth for i, depth in enumerate(depths)
+                   if sum(estimate < bounds[i + 1] for estimate in estimates) * maxAttempts < count * UNIFORM_SAMPLE]
+        if shallow:
+            raise ValueError(f'Uniformly random {spec.size}x{spec.size} boards are too deep for buckets {shallow}: '
+                             f'their lower bounds are {min(estimates)} to {max(estimates)} moves.')
+    buckets = {depth: [] for depth in depths}
+    attempts = 0
+    while any(len(bucket) < count for bucket in buckets.values()) and attempts < maxAttempts:
+        attempts += 1
+        if uniform:
+            board = uniformBoard(rng, spec)
+        else:
+            # Aim the walk at the first bucket still short of instances; walks are longer than their optimal depth.
+            target = min(i for i, depth in enumerate(depths) if len(buckets[depth]) < count)
+            board = Puzzle.getNewBoard(spec)
+            prevMove = None
+            for _ in range(rng.randint(bounds[target], 2 * bounds[target + 1])):
+                prevMove = rng.choice(Puzzle.getValidMoves(board, prevMove, spec))
+                Puzzle.makeMove(board, prevMove, spec)
+        # Only run the (possibly slow) optimal search for depths a bucket still needs.
+        estimate = Puzzle.linearConflict(board, spec)
+        if estimate >= bounds[-1]:
+            continue
+        result = Search.IDAstar(board, Puzzle.linearConflict, timeout, spec)
+        if not result.solved:
+            continue
+        for i, depth in enumerate(depths):
+            if depth <= result.depth < bounds[i + 1] and len(buckets[depth]) < count:
+                buckets[depth].append({'id': f'{spec.size}x{spec.size}-{depth}-{len(buckets[depth])}',
+                                       'board': board, 'depth': result.depth, 'bucket': depth})
+    return [instance for depth in depths for instance in buckets[depth]]
+
+def unfilledBuckets(instances, depths, count):
+    """Return {bucket: instances found} for the buckets of an instance list
+    holding fewer than `count` instances."""
+    found = {depth: 0 for depth in depths}
+    for instance in instances:
+        found[instance['bucket']] += 1
+    return {depth: number for depth, number in found.items() if number < count}
+
+def peakMemory():
+    """Return the peak resident set size of this process in bytes, or None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports kilobytes.
+
+def runCombination(algorithm, heuristicName, instances, timeout, size):
+    """Solve every instance with one search and heuristic and return the
+    per-instance results and the peak memory. Runs in a fresh process so the
+    peak belongs to this combination alone."""
+    spec = PuzzleSpec.ofSize(size)
+    heuristic = getHeuristic(heuristicName, spec) if heuristicName else None
+    runs = []
+    for instance in instances:
+        result = Search.solve(list(instance['board']), algorithm, heuristic, timeout, spec)
+        runs.append({
+            'id': instance['id'],
+            'bucket': instance['bucket'],
+            'solved': result.solved,
+            'timed_out': result.timed_out,
+            'depth': result.depth,
+            'optimal_depth': instance['depth'],
+            'suboptimality_bound': result.suboptimality_bound,
+            'expanded_nodes': result.expanded_nodes,
+            'max_fringe_size': result.max_fringe_size,
+            'wall_time': result.wall_time,
+            'cpu_time': result.cpu_time,
+        })
+    return {'runs': runs, 'peak_rss_bytes': peakMemory()}
+
+def summarize(runs):
+    """Aggregate the runs of one bucket."""
+    solved = [run for run in runs if run['solved']]
+    wall_time = sum(run['wall_time'] for run in runs)
+    expanded_nodes = sum(run['expanded_nodes'] for run in runs)
+    return {
+        'instances': len(runs),
+        'solved': len(solved),
+        'timed_out': sum(run['timed_out'] for run in runs),
+        'suboptimal': sum(run['depth'] != run['optimal_depth'] for run in solved),
+        'mean_solution_length': sum(run['depth'] for run in solved) / len(solved) if solved else None,
+        'expanded_nodes': expanded_nodes,
+        'wall_time': wall_time,
+        'nodes_per_second': expanded_nodes / wall_time if wall_time else None,
+    }
+
+def combinations(algorithms=None, heuristics=None):
+    """Yield (algorithm, heuristic name or None) for every search and, for
+    searches that take one, every heuristic."""
+    for algorithm in algorithms or sorted(ALGORITHMS):
+        if ALGORITHMS[algorithm][1]:
+            for heuristicName in heuristics or sorted(HEURISTICS):
+                yield algorithm, heuristicName
+        else:
+            yield algorithm, None
+
+def runBenchmark(instanceSet, algorithms=None, heuristics=None, timeout=10, log=sys.stderr):
+    """Run every combination over an instance set and return the report."""
+    instances = instanceSet['instances']
+    report = {'version': FORMAT_VERSION, 'size': instanceSet['size'], 'seed': instanceSet['seed'],
+              'timeout': timeout, 'results': {}}
+    for algorithm, heuristicName in combinations(algorithms, heuristics):
+        name = algorithm if heuristicName is None else f'{algorithm}/{heuristicName}'
+        print(f'Running {name}...', file=log)
+        with ProcessPoolExecutor(max_workers=1) as pool:  # A fresh process per combination.
+            outcome = pool.submit(runCombination, algorithm, heuristicName, instances, timeout,
+                                  instanceSet['size']).result()
+        buckets = {}
+        for run in outcome['runs']:
+            buckets.setdefault(str(run['bucket']), []).append(run)
+        report['results'][name] = {
+            'peak_rss_bytes': outcome['peak_rss_bytes'],
+            'buckets': {bucket: summarize(runs) for bucket, runs in buckets.items()},
+            'runs': outcome['runs'],
+        }
+    return report
+
+def compareReports(current, baseline, tolerance=0.1):
+    """Return the regressions of `current` against `baseline`: slower nodes
+    per second, more expansions or memory beyond `tolerance` (a fraction),
+    and any loss of solved instances or solution quality."""
+    regressions = []
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        before = baseline['results'][name]
+        if result['peak_rss_bytes'] and before['peak_rss_bytes'] and \
+                result['peak_rss_bytes'] > before['peak_rss_bytes'] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {before['peak_rss_bytes']} -> {result['peak_rss_bytes']} bytes")
+        for bucket, summary in result['buckets'].items():
+            old = before['buckets'].get(bucket)
+            if old is None:
+                continue
+            label = f'{name} depth {bucket}'
+            if summary['solved'] < old['solved']:
+                regressions.append(f"{label}: solved {old['solved']} -> {summary['solved']}")
+            if summary['suboptimal'] > old['suboptimal']:
+                regressions.append(f"{label}: suboptimal {old['suboptimal']} -> {summary['suboptimal']}")
+            if summary['solved'] == old['solved'] and summary['expanded_nodes'] > old['expanded_nodes'] * (1 + tolerance):
+                regressions.append(f"{label}: expanded nodes {old['expanded_nodes']} -> {summary['expanded_nodes']}")
+            if summary['nodes_per_second'] and old['nodes_per_second'] and \
+                    summary['nodes_per_second'] < old['nodes_per_second'] * (1 - tolerance):
+                regressions.append(f"{label}: nodes per second {old['nodes_per_second']:.0f} -> {summary['nodes_per_second']:.0f}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the searches and heuristics on reproducible instance sets.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    generate = commands.add_parser('generate', help='Generate a seeded instance set bucketed by optimal depth.')
+    generate.add_argument('-o', '--output', required=True)
+    generate.add_argument('-s', '--seed', type=int, default=1)
+    generate.add_argument('-S', '--size', type=int, default=SIZE, help=f'Board size (default: {SIZE}).')
+    generate.add_argument('-n', '--count', type=int, default=5, help='Instances per bucket (default: 5).')
+    generate.add_argument('-d', '--depths', default='5,10,15,20,25,30', help='Lower bounds of the depth buckets.')
+    generate.add_argument('--uniform', action='store_true',
+                          help='Use uniformly random boards instead of random walks. Their optimal lengths are those of '
+                               'the whole puzzle, about 40-60 on 4x4 and 15-31 on 3x3, so the depths must match.')
+    run = commands.add_parser('run', help='Run the searches over an instance set.')
+    run.add_argument('instances')
+    run.add_argument('-o', '--output', required=True)
+    run.add_argument('-a', '--algorithms', help='Comma-separated searches (default: all).')
+    run.add_argument('-H', '--heuristics', help='Comma-separated heuristics (default: all in puzzle.HEURISTICS).')
+    run.add_argument('-t', '--timeout', type=float, default=10, help='Seconds allowed per instance (default: 10).')
+    run.add_argument('-b', '--baseline', help='Report regressions against this earlier result file.')
+    run.add_argument('--tolerance', type=float, default=0.1, help='Allowed slowdown as a fraction (default: 0.1).')
+    compare = commands.add_parser('compare', help='Compare two result files.')
+    compare.add_argument('current')
+    compare.add_argument('baseline')
+    compare.add_argument('--tolerance', type=float, default=0.1, help='Allowed slowdown as a fraction (default: 0.1).')
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        depths = [int(depth) for depth in args.depths.split(',')]
+        try:
+            instances = generateInstances(args.seed, depths, args.count, args.uniform, spec=PuzzleSpec.ofSize(args.size))
+        except ValueError as error:
+            parser.error(str(error))
+        with open(args.output, 'w') as file:
+            json.dump({'version': FORMAT_VERSION, 'size': args.size, 'seed': args.seed, 'depths': depths,
+                       'instances': instances}, file, indent=1)
+        print(f'Wrote {len(instances)} instances to {args.output}.')
+        unfilled = unfilledBuckets(instances, depths, args.count)
+        for depth, found in unfilled.items():
+            print(f'Bucket {depth} holds only {found} of {args.count} instances: boards of that depth were too rare, '
+                  f'or too slow to solve optimally.', file=sys.stderr)
+        return 1 if unfilled else 0
+
+    if args.command == 'run':
+        with open(args.instances) as file:
+            instanceSet = json.load(file)
+        report = runBenchmark(instanceSet, args.algorithms and args.algorithms.split(','),
+                              args.heuristics and args.heuristics.split(','), args.timeout)
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=1)
+        print(f'Wrote results to {args.output}.')
+        if not args.baseline:
+            return 0
+        current, baselinePath = report, args.baseline
+    else:
+        with open(args.current) as file:
+            current = json.load(file)
+        baselinePath = args.baseline
+
+    with open(baselinePath) as file:
+        baseline = json.load(file)
+    regressions = compareReports(current, baseline, args.tolerance)
+    for regression in regressions:
+        print('REGRESSION', regression)
+    if not regressions:
+        print(f'No regressions against {baselinePath}.')
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
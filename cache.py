@@ -0,0 +1,174 @@
+import json
+import sqlite3
+from collections import OrderedDict
+from puzzle import Puzzle, DEFAULT_SPEC, BLANK, UP, DOWN, LEFT, RIGHT
+from search import Search, SearchResult, ALGORITHMS
+
+# Transposing the board swaps rows and columns, so a move of the blank along
+# one becomes the same move along the other.
+TRANSPOSED_MOVES = {UP: LEFT, LEFT: UP, DOWN: RIGHT, RIGHT: DOWN}
+
+# Transpose tables by spec: (cell map, tile relabelling), or None.
+_transposeTables = {}
+
+class SolutionCache:
+    """A cache of search results in front of Search.solve. Results are kept
+    in an in-process LRU of at most maxSize entries and, if a path is given,
+    in an SQLite file that outlives the process and can be shared. Entries
+    are keyed on the spec, the algorithm/heuristic tag and the board.
+
+    A board and its transpose (mirrored about the main diagonal, with the
+    tiles renamed so the goal maps onto itself) need the same number of
+    moves, and a solution of one, with UP/LEFT and DOWN/RIGHT swapped, solves
+    the other. Both are stored under the smaller of their packed states, so
+    solving one also answers the other."""
+
+    def __init__(self, maxSize=10000, path=None):
+        self.maxSize = maxSize
+        # (spec key, tag, canonical state) -> (SearchResult in the canonical orientation, whether the
+        # board it was stored for was the transpose), oldest first.
+        self.entries = OrderedDict()
+        self.hits = 0  # Lookups answered from memory or disk.
+        self.misses = 0  # Lookups that had to search.
+        self.diskHits = 0  # Hits found in the SQLite file rather than in memory.
+        self.symmetryHits = 0  # Hits on the transpose of the board that was stored.
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path, timeout=30)  # Wait for other processes writing the same file.
+            self.db.execute('CREATE TABLE IF NOT EXISTS solutions ('
+                            'spec TEXT, tag TEXT, state TEXT, result TEXT, transposed INTEGER, '
+                            'PRIMARY KEY (spec, tag, state))')
+            self.db.commit()
+
+    @staticmethod
+    def transposeTables(spec=DEFAULT_SPEC):
+        """Return (cells, relabel) for the spec: the transpose moves the tile
+        on cell i to cells[i] and renames tile t to relabel[t]. Returns None
+        if the goal is not mapped onto itself, that is if its blank is off
+        the main diagonal."""
+        if spec not in _transposeTables:
+            size = spec.size
+            cells = [(i % size) * size + i // size for i in range(spec.cells)]  # (row, column) -> (column, row).
+            relabel = [spec.goal[cells[spec.goalIndex[tile]]] for tile in range(spec.cells)]
+            _transposeTables[spec] = (cells, relabel) if relabel[BLANK] == BLANK else None
+        return _transposeTables[spec]
+
+    @staticmethod
+    def transposeBoard(board, spec=DEFAULT_SPEC):
+        """Return the transpose of a list board, or None if the spec has no transpose symmetry."""
+        tables = SolutionCache.transposeTables(spec)
+        if tables is None:
+            return None
+        cells, relabel = tables
+        transposed = [BLANK] * spec.cells
+        for i in range(spec.cells):
+            transposed[cells[i]] = relabel[board[i]]
+        return transposed
+
+    @staticmethod
+    def transposeMoves(moves):
+        """Return the moves that solve the transposed board."""
+        return [TRANSPOSED_MOVES[move] for move in moves]
+
+    @staticmethod
+    def makeTag(algorithm, heuristic=None):
+        """Return the tag of a search: the algorithm, plus the heuristic's name
+        for searches that take one (Manhattan distance when none is given,
+        as in Search.solve)."""
+        if not ALGORITHMS[algorithm][1]:
+            return algorithm
+        return f'{algorithm}/{(heuristic or Puzzle.manhattanDistance).__name__}'
+
+    @staticmethod
+    def canonicalState(board, spec=DEFAULT_SPEC):
+        """Return (state, transposed): the smaller packed state of the board
+        and its transpose, and whether it is the transpose's."""
+        state = Puzzle.packBoard(board, spec)
+        transposed = SolutionCache.transposeBoard(board, spec)
+        if transposed is not None:
+            transposed_state = Puzzle.packBoard(transposed, spec)
+            if transposed_state < state:
+                return transposed_state, True
+        return state, False
+
+    def get(self, board, tag, spec=DEFAULT_SPEC):
+        """Return the cached result of `tag` on the board, or None. Does not
+        count hits or misses."""
+        state, transposed = SolutionCache.canonicalState(board, spec)
+        key = (','.join(map(str, spec.goal)), tag, format(state, 'x'))
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)  # Most recently used.
+        elif self.db is not None:
+            row = self.db.execute('SELECT result, transposed FROM solutions WHERE spec = ? AND tag = ? AND state = ?',
+                                  key).fetchone()
+            if row is None:
+                return None
+            entry = (SearchResult(**json.loads(row[0])), bool(row[1]))
+            self.remember(key, entry)
+            self.diskHits += 1
+        else:
+            return None
+        result, storedTransposed = entry
+        if transposed != storedTransposed:
+            self.symmetryHits += 1
+        if transposed:
+            result = result._replace(moves=SolutionCache.transposeMoves(result.moves))
+        return result._replace(moves=list(result.moves))  # The caller may change the moves.
+
+    def put(self, board, tag, result, spec=DEFAULT_SPEC):
+        """Store the result of `tag` on the board. Timed-out results, and
+        failures at a memory limit, are not stored, since another timeout or
+        limit could give another answer."""
+        if result.timed_out or (result.memory_limited and not result.solved):
+            return
+        state, transposed = SolutionCache.canonicalState(board, spec)
+        if transposed:
+            result = result._replace(moves=SolutionCache.transposeMoves(result.moves))
+        key = (','.join(map(str, spec.goal)), tag, format(state, 'x'))
+        self.remember(key, (result, transposed))
+        if self.db is not None:
+            self.db.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?)',
+                            key + (json.dumps(result._asdict()), transposed))
+            self.db.commit()
+
+    def remember(self, key, entry):
+        """Add an entry to the LRU, evicting the least recently used ones."""
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False)
+
+    def solve(self, board, algorithm='astar', heuristic=None, timeout=None, spec=DEFAULT_SPEC):
+        """Search.solve with the cache in front: a hit returns the stored
+        result (with the statistics of the search that found it) without
+        searching, and a miss searches and stores the result."""
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, spec)  # Accept packed boards too.
+        tag = SolutionCache.makeTag(algorithm, heuristic)
+        result = self.get(board, tag, spec)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = Search.solve(list(board), algorithm, heuristic, timeout, spec)
+        self.put(board, tag, result, spec)
+        return result
+
+    def stats(self):
+        """Return the cache counters."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'disk_hits': self.diskHits,
+            'symmetry_hits': self.symmetryHits,
+            'hit_rate': self.hits / lookups if lookups else None,
+            'entries': len(self.entries),
+        }
+
+    def close(self):
+        """Close the SQLite file, if any."""
+        if self.db is not None:
+            self.db.close()
+            self.db = None
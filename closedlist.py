@@ -0,0 +1,266 @@
+import bisect
+import mmap
+import sys
+import tempfile
+from array import array
+from puzzle import DEFAULT_SPEC, UP, DOWN, LEFT, RIGHT
+
+try:
+    import numpy as np  # Only used to sort spilled runs faster.
+except ImportError:
+    np = None
+
+# What a closed list can do when it reaches its memory limit.
+ON_MEMORY_LIMIT = ('fail', 'spill', 'reexpand')
+
+# Moves stored as one byte: MOVES[code], with 0 for the start state's missing move.
+MOVES = (None, UP, DOWN, LEFT, RIGHT)
+MOVE_CODES = {move: code for code, move in enumerate(MOVES)}
+
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15  # 2**64 / golden ratio, spreads packed states over the table.
+WORD_MASK = (1 << 64) - 1
+
+class ClosedListFull(Exception):
+    """Raised when a closed list reaches its memory limit and cannot spill."""
+
+class DictClosedList(dict):
+    """The default closed list: a dict of packed state -> (parent state, move
+    from the parent). Fast, but every entry costs a dict slot, a tuple and
+    an int object, well over a hundred bytes."""
+
+    def __init__(self, spec=DEFAULT_SPEC):
+        super().__init__()
+        # A state's int and its (parent, move) tuple; the parent is another entry's key.
+        self.entryBytes = sys.getsizeof(1 << (spec.cells * spec.tileBits - 1)) + sys.getsizeof((0, None))
+
+    def nbytes(self):
+        """Estimated bytes held by the closed list."""
+        return sys.getsizeof(self) + len(self) * self.entryBytes
+
+class CappedDictClosedList(DictClosedList):
+    """A dict closed list that raises ClosedListFull rather than grow past
+    memoryLimit bytes, for states too wide for CompactClosedList."""
+
+    def __init__(self, spec=DEFAULT_SPEC, memoryLimit=None):
+        super().__init__(spec)
+        self.memoryLimit = memoryLimit
+
+    def __setitem__(self, state, value):
+        if state not in self and self.nbytes() + self.entryBytes > self.memoryLimit:
+            raise ClosedListFull(f'Closed list reached its limit of {self.memoryLimit} bytes')
+        super().__setitem__(state, value)
+
+class CompactClosedList:
+    """A closed list of packed states of at most 64 bits that works like a
+    dict of state -> (parent state, move) in about 20 bytes per entry.
+
+    Entries are kept in insertion order in three arrays: the states and
+    their parents as unsigned 64-bit words (0, which no board packs to,
+    standing for no parent) and the moves as one byte each. An open
+    addressing table of 32-bit entry numbers (0 for an empty slot) with
+    linear probing finds a state's entry.
+
+    With a memoryLimit, an insertion that would take the arrays past it
+    either raises ClosedListFull or, when onMemoryLimit is 'spill', writes
+    the entries to a sorted run in a temporary file and starts again
+    empty. Lookups then binary search the runs after the table. A new run
+    is merged into the one before it until that one holds more than twice
+    as many entries, so there are only O(log n) runs to search, each one
+    memory-mapped with its file already closed."""
+
+    def __init__(self, spec=DEFAULT_SPEC, memoryLimit=None, onMemoryLimit='fail', capacity=256):
+        if spec.cells * spec.tileBits > 64:
+            raise ValueError(f'{spec.cells * spec.tileBits}-bit states do not fit a compact closed list')
+        self.memoryLimit = memoryLimit
+        self.onMemoryLimit = onMemoryLimit
+        self.initialCapacity = capacity  # A power of two.
+        self.runs = []  # Spilled (mapping, states, parents, moves), each sorted by state, oldest first.
+        self.spilledEntries = 0
+        self.spilledBytes = 0
+        self.reset()
+
+    def reset(self):
+        """Empty the in-memory table."""
+        self.capacity = self.initialCapacity
+        self.shift = 64 - (self.capacity.bit_length() - 1)  # Keep the top bits of the hash.
+        self.index = array('I', [0]) * self.capacity
+        self.states = array('Q')
+        self.parents = array('Q')
+        self.moves = array('b')
+
+    def __len__(self):
+        return len(self.states) + self.spilledEntries
+
+    def clear(self):
+        """Forget every entry, in memory and spilled."""
+        for run in self.runs:
+            CompactClosedList.closeRun(run)
+        self.runs = []
+        self.spilledEntries = 0
+        self.spilledBytes = 0
+        self.reset()
+
+    def nbytes(self):
+        """Bytes held in memory by the closed list's arrays."""
+        return (self.index.itemsize * len(self.index) + self.states.itemsize * len(self.states)
+                + self.parents.itemsize * len(self.parents) + self.moves.itemsize * len(self.moves))
+
+    def lookup(self, state):
+        """Return (slot, entry number + 1) of the state in the table, or the
+        empty slot it would go in and 0."""
+        index, states = self.index, self.states
+        mask = self.capacity - 1
+        slot = ((state * HASH_MULTIPLIER) & WORD_MASK) >> self.shift
+        while True:
+            entry = index[slot]
+            if not entry or states[entry - 1] == state:
+                return slot, entry
+            slot = (slot + 1) & mask  # Linear probing.
+
+    def findSpilled(self, state):
+        """Return (parent, move) of the state from the spilled runs, or None."""
+        for mapping, states, parents, moves in reversed(self.runs):  # The latest run first.
+            i = bisect.bisect_left(states, state)
+            if i < len(states) and states[i] == state:
+                return parents[i] or None, MOVES[moves[i]]
+        return None
+
+    def __contains__(self, state):
+        if self.lookup(state)[1]:
+            return True
+        return bool(self.runs) and self.findSpilled(state) is not None
+
+    def __getitem__(self, state):
+        entry = self.lookup(state)[1]
+        if entry:
+            return self.parents[entry - 1] or None, MOVES[self.moves[entry - 1]]
+        found = self.findSpilled(state) if self.runs else None
+        if found is None:
+            raise KeyError(state)
+        return found
+
+    def __setitem__(self, state, value):
+        parent, move = value
+        slot, entry = self.lookup(state)
+        if entry:  # Already in the table: replace how it was reached.
+            self.parents[entry - 1] = parent or 0
+            self.moves[entry - 1] = MOVE_CODES[move]
+            return
+        grow = 3 * (len(self.states) + 1) > 2 * self.capacity  # Keep the table at most 2/3 full.
+        if self.memoryLimit is not None:
+            needed = self.nbytes() + 17 + (self.index.itemsize * self.capacity if grow else 0)
+            if needed > self.memoryLimit:
+                if self.onMemoryLimit != 'spill' or not self.states:
+                    raise ClosedListFull(f'Closed list reached its limit of {self.memoryLimit} bytes')
+                self.spill()
+                slot, entry = self.lookup(state)
+                grow = False
+        self.states.append(state)
+        self.parents.append(parent or 0)
+        self.moves.append(MOVE_CODES[move])
+        if grow:
+            self.resize(2 * self.capacity)
+        else:
+            self.index[slot] = len(self.states)
+
+    def resize(self, capacity):
+        """Rebuild the table with `capacity` slots, including every entry."""
+        self.capacity = capacity
+        self.shift = 64 - (capacity.bit_length() - 1)
+        index = self.index = array('I', [0]) * capacity
+        mask = capacity - 1
+        shift = self.shift
+        for entry, state in enumerate(self.states, 1):
+            slot = ((state * HASH_MULTIPLIER) & WORD_MASK) >> shift
+            while index[slot]:
+                slot = (slot + 1) & mask
+            index[slot] = entry
+
+    def spill(self):
+        """Write the in-memory entries to a new sorted run on disk, merge it
+        into the runs before it while they are not much bigger, and empty
+        the table."""
+        count = len(self.states)
+        if np is not None:
+            order = np.argsort(np.frombuffer(self.states, dtype=np.uint64), kind='stable')
+            states = np.frombuffer(self.states, dtype=np.uint64)[order].tobytes()
+            parents = np.frombuffer(self.parents, dtype=np.uint64)[order].tobytes()
+            moves = np.frombuffer(self.moves, dtype=np.int8)[order].tobytes()
+        else:
+            order = sorted(range(count), key=self.states.__getitem__)
+            states = array('Q', (self.states[i] for i in order)).tobytes()
+            parents = array('Q', (self.parents[i] for i in order)).tobytes()
+            moves = array('b', (self.moves[i] for i in order)).tobytes()
+        self.reset()  # Free the table before merging.
+        run = CompactClosedList.writeRun(states, parents, moves)
+        while self.runs and len(self.runs[-1][1]) <= 2 * len(run[1]):
+            run = CompactClosedList.mergeRuns(self.runs.pop(), run)
+        self.runs.append(run)
+        self.spilledEntries = sum(len(states) for mapping, states, parents, moves in self.runs)
+        self.spilledBytes = 17 * self.spilledEntries
+
+    @staticmethod
+    def writeRun(states, parents, moves):
+        """Write a run's sorted states, parents and moves (as bytes) to a
+        temporary file and return it memory-mapped as (mapping, states,
+        parents, moves). The file is closed, and so removed, once mapped;
+        the mapping keeps its data."""
+        count = len(moves)
+        with tempfile.TemporaryFile(prefix='closed-', suffix='.run') as file:
+            file.write(states)
+            file.write(parents)
+            file.write(moves)
+            file.flush()
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapping)
+        return (mapping, view[:8 * count].cast('Q'), view[8 * count:16 * count].cast('Q'), view[16 * count:].cast('b'))
+
+    @staticmethod
+    def closeRun(run):
+        """Unmap a run."""
+        mapping, states, parents, moves = run
+        for view in (states, parents, moves):
+            view.release()
+        mapping.close()
+
+    @staticmethod
+    def mergeRuns(older, newer):
+        """Merge two runs into a new one, closing both. A state in both keeps
+        the newer run's entry."""
+        if np is not None:
+            states = np.concatenate((np.frombuffer(older[1], dtype=np.uint64), np.frombuffer(newer[1], dtype=np.uint64)))
+            parents = np.concatenate((np.frombuffer(older[2], dtype=np.uint64), np.frombuffer(newer[2], dtype=np.uint64)))
+            moves = np.concatenate((np.frombuffer(older[3], dtype=np.int8), np.frombuffer(newer[3], dtype=np.int8)))
+            order = np.argsort(states, kind='stable')  # Equal states keep their order, the newer last.
+            states = states[order]
+            keep = np.append(states[1:] != states[:-1], True)  # The last copy of each state.
+            merged = (states[keep].tobytes(), parents[order][keep].tobytes(), moves[order][keep].tobytes())
+        else:
+            entries = dict(zip(older[1], zip(older[2], older[3])))
+            entries.update(zip(newer[1], zip(newer[2], newer[3])))
+            keys = sorted(entries)
+            merged = (array('Q', keys).tobytes(), array('Q', (entries[key][0] for key in keys)).tobytes(),
+                      array('b', (entries[key][1] for key in keys)).tobytes())
+        CompactClosedList.closeRun(older)
+        CompactClosedList.closeRun(newer)
+        return CompactClosedList.writeRun(*merged)
+
+def makeClosedList(kind='dict', spec=DEFAULT_SPEC, memoryLimit=None, onMemoryLimit='fail'):
+    """Return an empty closed list: 'dict' or 'compact', limited to
+    memoryLimit bytes if given. Only the compact list can spill, so a
+    limited list that should spill is compact whatever the kind. States
+    wider than 64 bits always get a dict, which cannot spill: asking for
+    that raises ValueError."""
+    if kind not in ('dict', 'compact'):
+        raise ValueError(f"Unknown closed list {kind!r}, expected 'dict' or 'compact'")
+    if onMemoryLimit not in ON_MEMORY_LIMIT:
+        raise ValueError(f'Unknown memory limit policy {onMemoryLimit!r}, expected one of {ON_MEMORY_LIMIT}')
+    fits = spec.cells * spec.tileBits <= 64
+    spills = memoryLimit is not None and onMemoryLimit == 'spill'
+    if spills and not fits:
+        raise ValueError(f'{spec.cells * spec.tileBits}-bit states cannot spill, only states of at most 64 bits can')
+    if (kind == 'compact' or spills) and fits:
+        return CompactClosedList(spec, memoryLimit, onMemoryLimit)
+    if memoryLimit is not None:
+        return CappedDictClosedList(spec, memoryLimit)
+    return DictClosedList(spec)
@@ -0,0 +1,237 @@
+import argparse
+import json
+import sys
+import time
+from puzzle import Puzzle, DEFAULT_SPEC
+
+class CountingClosedList:
+    """A closed list that tells a SearchProfiler about every lookup that
+    finds a state already closed, that is every duplicate the search prunes.
+    Everything else is passed on to the closed list it wraps, which may also
+    be a plain set of closed states."""
+
+    def __init__(self, closed, profiler):
+        self.closed = closed
+        self.profiler = profiler
+
+    def __contains__(self, state):
+        if state in self.closed:
+            self.profiler.duplicates += 1
+            return True
+        return False
+
+    def __getitem__(self, state):
+        return self.closed[state]
+
+    def __setitem__(self, state, value):
+        self.closed[state] = value
+
+    def add(self, state):
+        self.closed.add(state)
+
+    def __len__(self):
+        return len(self.closed)
+
+    def nbytes(self):
+        return self.closed.nbytes()
+
+    def clear(self):
+        self.closed.clear()
+
+class SearchProfiler:
+    """Optional instrumentation for the searches in search.py. A search given
+    a profiler installs its hooks once at the start: the heuristic is wrapped
+    to count and time its evaluations, the open list's push to count the
+    generated states and the closed list to count the duplicates pruned, and
+    every TIMEOUT_CHECK_INTERVAL expansions the open and closed list sizes
+    are sampled. Without a profiler none of this is installed, so the
+    searches run exactly as they do uninstrumented. The hooks themselves
+    cost time, which the rates recorded include. A counter a search cannot
+    keep, like the duplicates of IDA*, which has no closed list, is None,
+    exported as null.
+
+    One profiler can record many runs, exported together as JSON or as a
+    Chrome trace (chrome://tracing or Perfetto):
+
+        profiler = SearchProfiler()
+        profiler.run('astar/linearConflict', Search.Astar, board, Puzzle.linearConflict)
+        profiler.writeChromeTrace('astar.trace.json')"""
+
+    def __init__(self):
+        self.runs = []  # Finished runs, as dicts ready for JSON.
+        self.origin = time.perf_counter()  # perf_counter() at time 0 of the trace.
+        self.begin(None)
+
+    def begin(self, name):
+        """Start recording a run called `name`."""
+        self.name = name
+        self.start = time.perf_counter()
+        self.generated = 0  # States put on the open list.
+        self.duplicates = 0  # Lookups that found a state already closed, None if the search has no closed list.
+        self.heuristicCalls = 0
+        self.heuristicTime = 0.0  # Seconds spent evaluating the heuristic.
+        self.samples = []  # (seconds since the start, expanded, generated, duplicates, open size, closed size, heuristic seconds)
+
+    def run(self, name, search, *args, **options):
+        """Run `search` with this profiler, record it as a run called `name`
+        and return its result."""
+        self.begin(name)
+        result = search(*args, profiler=self, **options)
+        self.end(result)
+        return result
+
+    def end(self, result):
+        """Finish the current run with the search's result."""
+        fringe, closed = self.samples[-1][4:6] if self.samples else (0, 0)
+        self.sample(result.expanded_nodes, fringe, closed)
+        samples = []
+        previous = (0.0, 0)
+        for seconds, expanded, generated, duplicates, fringe, closed, heuristicTime in self.samples:
+            elapsed = seconds - previous[0]
+            samples.append({
+                'time': seconds,
+                'expanded': expanded,
+                'generated': generated,
+                'duplicates': duplicates,
+                'open': fringe,
+                'closed': closed,
+                'heuristic_time': heuristicTime,
+                'nodes_per_second': (expanded - previous[1]) / elapsed if elapsed > 0 else None,
+            })
+            previous = (seconds, expanded)
+        self.runs.append({
+            'name': self.name,
+            'start': self.start - self.origin,
+            'solved': result.solved,
+            'timed_out': result.timed_out,
+            'depth': result.depth,
+            'wall_time': result.wall_time,
+            'cpu_time': result.cpu_time,
+            'expanded': result.expanded_nodes,
+            'generated': self.generated,
+            'duplicates': self.duplicates,
+            'heuristic_calls': self.heuristicCalls,
+            'heuristic_time': self.heuristicTime,
+            'nodes_per_second': result.expanded_nodes / result.wall_time if result.wall_time > 0 else None,
+            'max_fringe_size': result.max_fringe_size,
+            'closed_bytes': result.closed_bytes,
+            'samples': samples,
+        })
+        self.begin(None)
+
+    # Hooks, called by the searches only when they are given a profiler.
+
+    def sample(self, expanded, fringe, closed):
+        """Record the search's progress and list sizes."""
+        if self.samples and self.samples[-1][1] == expanded:
+            return  # Nothing expanded since the last sample.
+        self.samples.append((time.perf_counter() - self.start, expanded, self.generated, self.duplicates,
+                             fringe, closed, self.heuristicTime))
+
+    def countGenerated(self, push):
+        """Return `push` counting every state it puts on the open list."""
+        def counted(*args):
+            self.generated += 1
+            return push(*args)
+        return counted
+
+    def watchClosedList(self, closed):
+        """Return the closed list wrapped to count the duplicates found in it."""
+        return CountingClosedList(closed, self)
+
+    def timeHeuristic(self, heuristic):
+        """Return the heuristic wrapped to count and time its evaluations,
+        with its incremental version, if it has one, wrapped the same way."""
+        clock = time.perf_counter
+        def timed(board, spec=DEFAULT_SPEC):
+            start = clock()
+            value = heuristic(board, spec)
+            self.heuristicTime += clock() - start
+            self.heuristicCalls += 1
+            return value
+        timed.__name__ = heuristic.__name__
+        if getattr(heuristic, 'spec', None) is not None:
+            timed.spec = heuristic.spec  # Tied to one goal, like the heuristic itself.
+        if not Puzzle.isIntegral(heuristic):
+            timed.fractional = True
+        delta = Puzzle.getHeuristicDelta(heuristic)
+        if delta:
+            def timedDelta(board, h, tile, fromIndex, toIndex, spec=DEFAULT_SPEC):
+                start = clock()
+                value = delta(board, h, tile, fromIndex, toIndex, spec)
+                self.heuristicTime += clock() - start
+                self.heuristicCalls += 1
+                return value
+            timed.delta = timedDelta
+        return timed
+
+    # Export
+
+    def toJSON(self):
+        """Return every recorded run as a JSON-ready dict."""
+        return {'runs': self.runs}
+
+    def writeJSON(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.toJSON(), file, indent=1)
+
+    def chromeTrace(self):
+        """Return the runs in the Chrome trace event format: a span per run,
+        with the counters of its samples as counter tracks."""
+        events = []
+        for run in self.runs:
+            start = run['start'] * 1e6  # Trace times are in microseconds.
+            summary = {key: value for key, value in run.items() if key != 'samples'}
+            events.append({'name': run['name'] or 'search', 'ph': 'X', 'ts': start, 'dur': run['wall_time'] * 1e6,
+                           'pid': 1, 'tid': 1, 'args': summary})
+            for sample in run['samples']:
+                ts = start + sample['time'] * 1e6
+                events.append({'name': 'lists', 'ph': 'C', 'ts': ts, 'pid': 1,
+                               'args': {'open': sample['open'], 'closed': sample['closed']}})
+                nodes = {key: sample[key] for key in ('expanded', 'generated', 'duplicates') if sample[key] is not None}
+                events.append({'name': 'nodes', 'ph': 'C', 'ts': ts, 'pid': 1, 'args': nodes})
+                events.append({'name': 'heuristic seconds', 'ph': 'C', 'ts': ts, 'pid': 1,
+                               'args': {'heuristic': sample['heuristic_time']}})
+                if sample['nodes_per_second'] is not None:
+                    events.append({'name': 'nodes per second', 'ph': 'C', 'ts': ts, 'pid': 1,
+                                   'args': {'expanded': sample['nodes_per_second']}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def writeChromeTrace(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.chromeTrace(), file)
+
+def main(argv=None):
+    from batch import getHeuristic, getSpec, readBoards
+    from search import Search, ALGORITHMS
+    parser = argparse.ArgumentParser(description='Profile a search on boards read from a JSONL or CSV file, one after another.')
+    parser.add_argument('input', nargs='?', help='Boards to profile (default: stdin).')
+    parser.add_argument('-f', '--format', choices=('jsonl', 'csv'), help='Input format (default: from the file name, else jsonl).')
+    parser.add_argument('-a', '--algorithm', choices=sorted(ALGORITHMS), default='astar')
+    parser.add_argument('--heuristic', default='manhattanDistance', help='Heuristic for the searches that take one.')
+    parser.add_argument('-t', '--timeout', type=float, default=10, help='Seconds allowed per board (default: 10).')
+    parser.add_argument('--json', metavar='FILE', help='Write the runs and their samples as JSON.')
+    parser.add_argument('--trace', metavar='FILE', help='Write a Chrome trace of the runs.')
+    args = parser.parse_args(argv)
+    fmt = args.format or ('csv' if args.input and args.input.endswith('.csv') else 'jsonl')
+    profiler = SearchProfiler()
+    stream = open(args.input, newline='') if args.input else sys.stdin
+    with stream:
+        for boardId, board, error in readBoards(stream, fmt):
+            if error is not None:
+                print(error, file=sys.stderr)
+                continue
+            spec = getSpec(board)
+            heuristic = getHeuristic(args.heuristic, spec) if ALGORITHMS[args.algorithm][1] else None
+            result = Search.solve(board, args.algorithm, heuristic, args.timeout, spec, profiler)
+            run = profiler.runs[-1]
+            duplicates = '' if run['duplicates'] is None else f"{run['duplicates']} duplicates, "
+            print(f"{boardId}: depth {result.depth}, {run['expanded']} expanded, {run['generated']} generated, "
+                  f"{duplicates}{round(run['heuristic_time'], 3)}s of {round(run['wall_time'], 3)}s in the heuristic")
+    if args.json:
+        profiler.writeJSON(args.json)
+    if args.trace:
+        profiler.writeChromeTrace(args.trace)
+
+if __name__ == "__main__":
+    main()
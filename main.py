@@ -1,65 +1,106 @@
 import os
-from puzzle import Puzzle
+import sys
+import time
+from puzzle import Puzzle, PuzzleSpec, DEFAULT_SPEC
 from search import Search
+from patterndb import PatternDatabase
+from walkingdistance import WalkingDistance
 
-def runAstar(puzzleBoard, heuristic):
-    puzzleCopy = list(puzzleBoard) 
-    solved, depth, expanded_nodes, max_fringe_size, timer = Search.Astar(puzzleCopy, heuristic)
-    print(f'Depth of solution: {depth}')
-    print(f'Expanded nodes: {expanded_nodes}') 
-    print(f'Max fringe size: {max_fringe_size}')  
-    print('Run in', round(timer, 3), 'seconds.') 
+def animateSolution(puzzleBoard, moves, delay=0.5, spec=DEFAULT_SPEC):
+    """Replay the moves on a copy of the board, redrawing it after each one."""
+    board = list(puzzleBoard)
+    for move in moves:
+        time.sleep(delay)
+        os.system('cls' if os.name == 'nt' else 'clear')
+        Puzzle.makeMove(board, move, spec)
+        Puzzle.displayBoard(board, spec)
+        print()
 
-def runBFS(puzzleBoard):
-    puzzleCopy = list(puzzleBoard) 
-    solved, depth, expanded_nodes, max_fringe_size, timer = Search.BFS(puzzleCopy)
-    print(f'Depth of solution: {depth}')
-    print(f'Expanded nodes: {expanded_nodes}') 
-    print(f'Max fringe size: {max_fringe_size}')  
-    print('Run in', round(timer, 3), 'seconds.') 
+def showResult(puzzleBoard, result, animate=True, spec=DEFAULT_SPEC):
+    """Print a search result, animating the solution first if there is one."""
+    if result.timed_out:
+        print("Timeout")
+    if result.solved:
+        if animate:
+            animateSolution(puzzleBoard, result.moves, spec=spec)
+        print('Solved in', result.depth, 'moves:')  # Print the number of moves taken to solve.
+        print(', '.join(result.moves))  # Print the moves made.
+    if result.suboptimality_bound is not None:
+        print(f'At most {round(result.suboptimality_bound, 3)} times the shortest solution.')
+    print(f'Depth of solution: {result.depth}')
+    print(f'Expanded nodes: {result.expanded_nodes}') 
+    print(f'Max fringe size: {result.max_fringe_size}')  
+    print('Run in', round(result.wall_time, 3), 'seconds.') 
 
-def runUCS(puzzleBoard):
-    puzzleCopy = list(puzzleBoard) 
-    solved, depth, expanded_nodes, max_fringe_size, timer = Search.UCS(puzzleCopy)
-    print(f'Depth of solution: {depth}')
-    print(f'Expanded nodes: {expanded_nodes}') 
-    print(f'Max fringe size: {max_fringe_size}')  
-    print('Run in', round(timer, 3), 'seconds.') 
+def runAstar(puzzleBoard, heuristic, spec=DEFAULT_SPEC):
+    print(f'\n>>>Attempting to solve the puzzle using A* with {heuristic.__name__}...')
+    showResult(puzzleBoard, Search.Astar(puzzleBoard, heuristic, spec=spec), spec=spec)
+
+def runIDAstar(puzzleBoard, heuristic, spec=DEFAULT_SPEC):
+    print(f'\n>>>Attempting to solve the puzzle using IDA* with {heuristic.__name__}...')
+    showResult(puzzleBoard, Search.IDAstar(puzzleBoard, heuristic, spec=spec), spec=spec)
+
+def runBidirectionalAstar(puzzleBoard, heuristic, spec=DEFAULT_SPEC):
+    print(f'\n>>>Attempting to solve the puzzle using Bidirectional A* with {heuristic.__name__}...')
+    showResult(puzzleBoard, Search.BidirectionalAstar(puzzleBoard, heuristic, spec=spec), spec=spec)
+
+def runWeightedAstar(puzzleBoard, heuristic, spec=DEFAULT_SPEC):
+    print(f'\n>>>Attempting to solve the puzzle using Weighted A* with {heuristic.__name__}...')
+    showResult(puzzleBoard, Search.WeightedAstar(puzzleBoard, heuristic, spec=spec), spec=spec)
 
-def runDFSR(puzzleBoard):
+def runARAstar(puzzleBoard, heuristic, spec=DEFAULT_SPEC):
+    print(f'\n>>>Attempting to solve the puzzle using ARA* with {heuristic.__name__} for up to 5 seconds...')
+    showResult(puzzleBoard, Search.ARAstar(puzzleBoard, heuristic, 5, spec), spec=spec)
+
+def runBeamSearch(puzzleBoard, heuristic, spec=DEFAULT_SPEC):
+    print(f'\n>>>Attempting to solve the puzzle using Beam Search with {heuristic.__name__}...')
+    showResult(puzzleBoard, Search.BeamSearch(puzzleBoard, heuristic, spec=spec), spec=spec)
+
+def runBFS(puzzleBoard, spec=DEFAULT_SPEC):
+    print('\n>>>Attempting to solve the puzzle using BFS...')
+    showResult(puzzleBoard, Search.BFS(puzzleBoard, spec=spec), spec=spec)
+
+def runBidirectionalBFS(puzzleBoard, spec=DEFAULT_SPEC):
+    print('\n>>>Attempting to solve the puzzle using Bidirectional BFS...')
+    showResult(puzzleBoard, Search.BidirectionalBFS(puzzleBoard, spec=spec), spec=spec)
+
+def runUCS(puzzleBoard, spec=DEFAULT_SPEC):
+    print('\n>>>Attempting to solve the puzzle using UCS...')
+    showResult(puzzleBoard, Search.UCS(puzzleBoard, spec=spec), spec=spec)
+
+def runDFSR(puzzleBoard, spec=DEFAULT_SPEC):
     puzzleCopy = list(puzzleBoard) 
     maxMoves = 10
     while True:
-        solved, depth, expanded_nodes, max_fringe_size, timer = Search.DFSR(puzzleCopy, maxMoves)
-        if solved: break
+        print('\n>>>Attempting to solve the puzzle using Recursive DFS in at most', maxMoves, 'moves...')
+        result = Search.DFSR(puzzleCopy, maxMoves, spec)
+        if result.solved: break
         maxMoves += 1
-    print(f'Depth of solution: {depth}')
-    print(f'Expanded nodes: {expanded_nodes}') 
-    print(f'Max fringe size: {max_fringe_size}')  
-    print('Run in', round(timer, 3), 'seconds.')  
+    showResult(puzzleBoard, result, spec=spec)
 
-def runDFS(puzzleBoard):
-    puzzleCopy = list(puzzleBoard) 
-    solved, depth, expanded_nodes, max_fringe_size, timer = Search.DFS(puzzleCopy)
-    print(f'Depth of solution: {depth}')
-    print(f'Expanded nodes: {expanded_nodes}') 
-    print(f'Max fringe size: {max_fringe_size}')  
-    print('Run in', round(timer, 3), 'seconds.') 
+def runDFS(puzzleBoard, spec=DEFAULT_SPEC):
+    print('\n>>> Attempting to solve the puzzle using DFS...')
+    showResult(puzzleBoard, Search.DFS(puzzleBoard, spec=spec), spec=spec)
 
 if __name__ == "__main__": 
     os.system('cls' if os.name == 'nt' else 'clear') 
-    Puzzle.SOLVED_BOARD = Puzzle.getNewBoard()
+    # The board size can be given on the command line: python main.py [size]
+    spec = PuzzleSpec.ofSize(int(sys.argv[1])) if len(sys.argv) > 1 else DEFAULT_SPEC
     # Generate a shuffled puzzle
     print ("Innitial Puzzle State:")
-    puzzleBoard = Puzzle.getNewPuzzle()
-    Puzzle.displayBoard(puzzleBoard)
-    # heuristics for A*
+    puzzleBoard = Puzzle.getNewPuzzle(spec)
+    Puzzle.displayBoard(puzzleBoard, spec)
+    # heuristics for A*; the ones backed by tables are loaded on first use
     heuristics = [
         Puzzle.misplacedTiles,
         Puzzle.euclideanDistance,
         Puzzle.manhattanDistance,
         Puzzle.rowColumnHeuristic,
-        Puzzle.linearConflict
+        Puzzle.linearConflict,
+        None,  # Pattern database
+        Puzzle.inversionDistance,
+        None,  # Walking distance
+        None,  # Max of walking distance and linear conflict
     ]
     # menu
     while True:
@@ -69,27 +110,61 @@ if __name__ == "__main__":
         print("3. Uniform Cost Search (UCS)")
         print("4. Depth-First Search (DFS)")
         print("5. Depth-First Search with Recursion Limit (DFSR)")
-        print("6. Exit")
-        choice = input("Enter your choice (1-6): ")
-        if choice == '1':
-            print("\nSelect a heuristic for A* Search:")
+        print("6. Iterative Deepening A* Search (IDA*)")
+        print("7. Bidirectional Breadth-First Search")
+        print("8. Bidirectional A* Search")
+        print("9. Weighted A* Search")
+        print("10. Anytime Repairing A* Search (ARA*)")
+        print("11. Beam Search")
+        print("12. Exit")
+        choice = input("Enter your choice (1-12): ")
+        if choice in ('1', '6', '8', '9', '10', '11'):
+            print("\nSelect a heuristic for " + {'1': "A*", '6': "IDA*", '8': "Bidirectional A*", '9': "Weighted A*",
+                                                '10': "ARA*", '11': "Beam"}[choice] + " Search:")
             print("1. Misplaced Tiles")
             print("2. Euclidean Distance")
             print("3. Manhattan Distance")
             print("4. Row-Column Heuristic")
             print("5. Linear Conflict")
-            heuristic_choice = int(input("Enter your choice (1-5): "))
+            print("6. Pattern Database")
+            print("7. Inversion Distance")
+            print("8. Walking Distance")
+            print("9. Max of Walking Distance and Linear Conflict")
+            heuristic_choice = int(input("Enter your choice (1-9): "))
+            if heuristics[heuristic_choice - 1] is None:  # Load the tables on first use.
+                try:
+                    if heuristic_choice == 6:
+                        heuristics[5] = PatternDatabase.loadOrBuild(spec=spec)
+                    else:
+                        heuristics[7] = WalkingDistance.loadOrBuild(spec=spec)
+                        heuristics[8] = Puzzle.maxHeuristic(heuristics[7], Puzzle.linearConflict)
+                except ValueError as error:
+                    print(error)
+                    continue
             heuristic = heuristics[heuristic_choice - 1]
-            runAstar(puzzleBoard, heuristic)
+            if choice == '1':
+                runAstar(puzzleBoard, heuristic, spec)
+            elif choice == '6':
+                runIDAstar(puzzleBoard, heuristic, spec)
+            elif choice == '8':
+                runBidirectionalAstar(puzzleBoard, heuristic, spec)
+            elif choice == '9':
+                runWeightedAstar(puzzleBoard, heuristic, spec)
+            elif choice == '10':
+                runARAstar(puzzleBoard, heuristic, spec)
+            else:
+                runBeamSearch(puzzleBoard, heuristic, spec)
         elif choice == '2':
-            runBFS(puzzleBoard)
+            runBFS(puzzleBoard, spec)
         elif choice == '3':
-            runUCS(puzzleBoard)
+            runUCS(puzzleBoard, spec)
         elif choice == '4':
-            runDFS(puzzleBoard)
+            runDFS(puzzleBoard, spec)
         elif choice == '5':
-            runDFSR(puzzleBoard)
-        elif choice == '6':
+            runDFSR(puzzleBoard, spec)
+        elif choice == '7':
+            runBidirectionalBFS(puzzleBoard, spec)
+        elif choice == '12':
             print("Exiting...")
             break
         else:
@@ -0,0 +1,111 @@
+import heapq
+import numbers
+
+class HeapOpenList:
+    """A binary heap of (f, g, item): pops the lowest f, then the lowest g,
+    then the smallest item. Push and pop take O(log n) comparisons. Works
+    for any f and g that can be compared, floats included."""
+
+    def __init__(self):
+        self.heap = []
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, f, g, item):
+        heapq.heappush(self.heap, (f, g, item))
+
+    def pop(self):
+        """Remove and return the (f, g, item) with the lowest f."""
+        return heapq.heappop(self.heap)
+
+class BucketOpenList:
+    """A two-level bucket queue for small non-negative integer f and g: one
+    bucket per f, holding one stack per g. Pops the lowest f, then the
+    highest g, then the item pushed last, so among equally promising states
+    the deepest, and the most recently generated, are expanded first. Push
+    and pop take O(1) amortized time and never compare items.
+
+    The first push of a non-integer f or g moves every item to a
+    HeapOpenList, which then serves the rest of the search, so a heuristic
+    that turns out to return floats still works, only slower."""
+
+    def __init__(self):
+        self.buckets = []  # buckets[f][g] is the stack of items with that f and g; the last stack of a bucket is never empty.
+        self.minF = 0  # No non-empty bucket below this f.
+        self.size = 0
+        self.heap = None  # The HeapOpenList holding everything once a cost was not an integer.
+
+    def __len__(self):
+        return self.size
+
+    def push(self, f, g, item):
+        if self.heap is not None:
+            self.heap.push(f, g, item)
+            self.size += 1
+            return
+        buckets = self.buckets
+        try:
+            while len(buckets) <= f:
+                buckets.append([])
+            bucket = buckets[f]
+            while len(bucket) <= g:
+                bucket.append([])
+            bucket[g].append(item)
+        except TypeError:  # A cost that cannot index a list, so not an integer.
+            self.moveToHeap()
+            self.push(f, g, item)
+            return
+        if f < self.minF:
+            self.minF = f  # Only an inconsistent heuristic lowers f along a path.
+        self.size += 1
+
+    def pop(self):
+        """Remove and return the (f, g, item) with the lowest f and highest g."""
+        if self.heap is not None:
+            f, g, item = self.heap.pop()
+            self.size -= 1
+            return f, g, item
+        if not self.size:
+            raise IndexError('pop from an empty open list')
+        buckets = self.buckets
+        f = self.minF
+        while not buckets[f]:
+            f += 1
+        self.minF = f
+        bucket = buckets[f]
+        g = len(bucket) - 1
+        stack = bucket[g]
+        item = stack.pop()
+        if not stack:
+            bucket.pop()
+            while bucket and not bucket[-1]:
+                bucket.pop()  # Keep the highest g on top.
+        self.size -= 1
+        return f, g, item
+
+    def moveToHeap(self):
+        """Move every item to a HeapOpenList and use it from now on."""
+        heap = HeapOpenList()
+        heap.heap = [(f, g, item) for f, bucket in enumerate(self.buckets) for g, stack in enumerate(bucket)
+                     for item in stack]
+        heapq.heapify(heap.heap)
+        self.heap = heap
+        self.buckets = []
+
+# Open lists by name, as searches take them.
+OPEN_LISTS = {
+    'heap': HeapOpenList,
+    'bucket': BucketOpenList,
+}
+
+def makeOpenList(kind, startValue=0, integral=True):
+    """Return an empty open list of the named kind. The bucket queue needs
+    integer costs, so it falls back to the heap when the heuristic is not
+    integral (see Puzzle.isIntegral), as with Euclidean distance, or when
+    startValue (the start state's heuristic) is not an integer."""
+    if kind not in OPEN_LISTS:
+        raise ValueError(f'Unknown open list {kind!r}, expected one of {sorted(OPEN_LISTS)}')
+    if kind == 'bucket' and not (integral and isinstance(startValue, numbers.Integral)):
+        kind = 'heap'
+    return OPEN_LISTS[kind]()
@@ -0,0 +1,372 @@
+import mmap
+import os
+import struct
+import sys
+from collections import deque
+from puzzle import Puzzle, PuzzleSpec, DEFAULT_SPEC, BLANK
+
+try:
+    import numpy as np  # Builds the tables a layer at a time; optional.
+except ImportError:
+    np = None
+
+MAGIC = b'PZPDB'  # File signature of a pattern database.
+FORMAT_VERSION = 3  # Bump when the file layout changes.
+UNSEEN = 255  # Table value of a pattern that the build has not reached yet.
+LAYER_CHUNK = 1 << 18  # Patterns expanded at once by the NumPy build, to bound its memory.
+if np is not None:
+    BIT_COUNTS = np.unpackbits(np.arange(1 << 16, dtype='>u2').view(np.uint8)).reshape(-1, 16).sum(axis=1).astype(np.int64)  # Popcount of 16 bits.
+
+# Disjoint tile groups whose pattern distances add up to an admissible heuristic.
+DEFAULT_PARTITIONS = {
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4)),  # The 6-6-3 partition.
+}
+
+class PatternDatabase:
+    """An additive pattern-database heuristic. Each group of tiles has a table,
+    indexed by the rank of the group's positions, holding the number of moves
+    of the group's own tiles needed to bring them home. Tables are stored in a
+    file and memory-mapped, so every process shares one copy of the pages."""
+
+    __name__ = 'patternDatabase'  # Searches print the heuristic's name.
+
+    def __init__(self, partition, tables, source=None, spec=DEFAULT_SPEC):
+        self.spec = spec  # The tables only hold for this board size and goal.
+        self.partition = tuple(tuple(tiles) for tiles in partition)
+        self.tables = tables  # One bytes-like table per group.
+        self.source = source  # The mmap backing the tables, if any.
+        self.groupOf = {}  # Tile -> index of its group.
+        for group, tiles in enumerate(self.partition):
+            for tile in tiles:
+                self.groupOf[tile] = group
+
+    def __call__(self, board, spec=None):
+        """Sum the pattern distances of every group of tiles on the board.
+        The tables belong to self.spec, so `spec` is only accepted to match
+        the other heuristics."""
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, self.spec)
+        distance = 0
+        for tiles, table in zip(self.partition, self.tables):
+            distance += table[PatternDatabase.rank([board.index(tile) for tile in tiles], self.spec)]
+        return distance
+
+    def delta(self, board, h, tile, fromIndex, toIndex, spec=None):
+        """Update the heuristic after moving `tile` from fromIndex to toIndex:
+        only the group holding `tile` changes, so only its table is read."""
+        group = self.groupOf.get(tile)
+        if group is None:
+            return h  # The tile is not part of any pattern.
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, self.spec)
+        tiles = self.partition[group]
+        table = self.tables[group]
+        positions = [board.index(t) for t in tiles]
+        new_distance = table[PatternDatabase.rank(positions, self.spec)]
+        positions[tiles.index(tile)] = fromIndex  # Put the tile back to look up the parent's value.
+        return h - table[PatternDatabase.rank(positions, self.spec)] + new_distance
+
+    def close(self):
+        """Release the memory-mapped file."""
+        for table in self.tables:
+            if isinstance(table, memoryview):
+                table.release()  # The mmap cannot close while views of it are alive.
+        self.tables = []
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+
+    @staticmethod
+    def defaultPartition(spec=DEFAULT_SPEC):
+        """Return the tile groups used for the spec's board size."""
+        if spec.size in DEFAULT_PARTITIONS:
+            return DEFAULT_PARTITIONS[spec.size]
+        tiles = list(range(1, spec.cells))
+        return tuple(tuple(tiles[i:i + 5]) for i in range(0, len(tiles), 5))  # Groups of at most 5 tiles.
+
+    @staticmethod
+    def defaultPath(spec=DEFAULT_SPEC):
+        """Return the file the default pattern database of a spec is stored in."""
+        name = f'patterns{spec.size}x{spec.size}'
+        if spec != PuzzleSpec.ofSize(spec.size):
+            name += '-' + '-'.join(str(tile) for tile in spec.goal)  # Tables for an unusual goal.
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), f'{name}.pdb')
+
+    @staticmethod
+    def tableSize(count, spec=DEFAULT_SPEC):
+        """Return the number of ways to place `count` distinct tiles on the board."""
+        size = 1
+        for i in range(count):
+            size *= spec.cells - i
+        return size
+
+    @staticmethod
+    def rank(positions, spec=DEFAULT_SPEC):
+        """Perfectly hash the cells of a group of tiles to 0..tableSize - 1.
+        Each position is numbered among the cells not used by earlier tiles,
+        and the numbers are combined as a mixed-radix integer."""
+        cells = spec.cells
+        rank = 0
+        used = 0  # Bitmask of the cells taken by earlier tiles.
+        for i in range(len(positions)):
+            p = positions[i]
+            rank = rank * (cells - i) + p - bin(used & ((1 << p) - 1)).count('1')
+            used |= 1 << p
+        return rank
+
+    @staticmethod
+    def unrank(rank, count, spec=DEFAULT_SPEC):
+        """Return the positions of a group of `count` tiles from its rank."""
+        cells = spec.cells
+        digits = []
+        for i in reversed(range(count)):
+            rank, digit = divmod(rank, cells - i)
+            digits.append(digit)
+        free = list(range(cells))
+        return [free.pop(digit) for digit in reversed(digits)]
+
+    @staticmethod
+    def buildTable(tiles, spec=DEFAULT_SPEC):
+        """Compute a group's table by breadth-first search backwards from the
+        solved board. The search tracks the blank along with the group's
+        tiles: the blank roams freely over the cells not held by group tiles
+        it can reach, and a group tile may slide into any cell of that
+        region, costing one move. Only those slides are counted, so the
+        tables of disjoint groups can be added without overestimating, and
+        each placement keeps its fewest moves over every blank position.
+        A search state is a placement and the region its blank is in, found
+        by its lowest cell. With NumPy installed, buildLayeredTable does the
+        same search much faster."""
+        if np is not None:
+            return PatternDatabase.buildLayeredTable(tiles, spec)
+        size = spec.size
+        cells = spec.cells
+        neighbours = []  # neighbours[cell] = cells a tile there can slide to.
+        for cell in range(cells):
+            y, x = divmod(cell, size)
+            neighbours.append([ny * size + nx for ny, nx in ((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1))
+                               if 0 <= ny < size and 0 <= nx < size])
+
+        def region(cell, free):
+            """Bitmask of the free cells the blank can reach from `cell`."""
+            reach = 1 << cell
+            stack = [cell]
+            while stack:
+                for q in neighbours[stack.pop()]:
+                    if free >> q & 1 and not reach >> q & 1:
+                        reach |= 1 << q
+                        stack.append(q)
+            return reach
+
+        count = len(tiles)
+        full = (1 << cells) - 1
+        table = bytearray([UNSEEN]) * PatternDatabase.tableSize(count, spec)
+        seen = bytearray(len(table) * cells)  # seen[rank * cells + lowest cell of the blank's region]
+        positions = [spec.goalIndex[tile] for tile in tiles]
+        start = PatternDatabase.rank(positions, spec)
+        blankRegion = region(spec.goalIndex[BLANK], full & ~sum(1 << p for p in positions))
+        table[start] = 0
+        seen[start * cells + (blankRegion & -blankRegion).bit_length() - 1] = 1
+        queue = deque([(start, blankRegion, 0)])
+        while queue:  # While there are states to expand.
+            current, blankRegion, distance = queue.popleft()
+            distance += 1
+            positions = PatternDatabase.unrank(current, count, spec)
+            free = full
+            for p in positions:
+                free &= ~(1 << p)
+            for i in range(count):  # Try sliding each tile of the group into the blank's region.
+                p = positions[i]
+                for q in neighbours[p]:
+                    if not blankRegion >> q & 1:
+                        continue  # The blank cannot get there first.
+                    positions[i] = q
+                    child = PatternDatabase.rank(positions, spec)
+                    childRegion = region(p, (free | 1 << p) & ~(1 << q))  # The blank is left where the tile was.
+                    key = child * cells + (childRegion & -childRegion).bit_length() - 1
+                    if not seen[key]:
+                        seen[key] = 1
+                        if table[child] == UNSEEN:
+                            table[child] = distance
+                        queue.append((child, childRegion, distance))
+                positions[i] = p
+        return table
+
+    @staticmethod
+    def rankArray(positions, spec=DEFAULT_SPEC):
+        """rank() for every row of an N x count NumPy array of positions."""
+        cells = spec.cells
+        ranks = np.zeros(len(positions), dtype=np.int64)
+        used = np.zeros(len(positions), dtype=np.int64)  # Bitmask of the cells taken by earlier tiles.
+        for i in range(positions.shape[1]):
+            p = positions[:, i].astype(np.int64)
+            below = used & ((1 << p) - 1)  # Earlier tiles on lower cells.
+            taken = np.zeros(len(positions), dtype=np.int64)
+            for shift in range(0, cells, 16):
+                taken += BIT_COUNTS[(below >> shift) & 0xFFFF]
+            ranks = ranks * (cells - i) + p - taken
+            used |= 1 << p
+        return ranks
+
+    @staticmethod
+    def regionArray(seeds, free, spec=DEFAULT_SPEC):
+        """The blank's region for every pair of a seed cell mask and a free
+        cell mask in two NumPy arrays: the seed grown a cell at a time over
+        free cells until it stops growing."""
+        size = spec.size
+        notFirstColumn = notLastColumn = 0
+        for cell in range(spec.cells):
+            if cell % size:
+                notFirstColumn |= 1 << cell
+            if cell % size != size - 1:
+                notLastColumn |= 1 << cell
+        reach = seeds
+        while True:
+            grown = reach | (((reach << size) | (reach >> size) | ((reach << 1) & notFirstColumn)
+                              | ((reach >> 1) & notLastColumn)) & free)
+            if np.array_equal(grown, reach):
+                return reach
+            reach = grown
+
+    @staticmethod
+    def buildLayeredTable(tiles, spec=DEFAULT_SPEC):
+        """buildTable() one distance layer at a time with NumPy. A layer is
+        an array of the groups' positions with an array of their blank
+        regions as cell masks; every slide of every tile is made on the whole
+        layer at once, the blank regions of the children are grown with
+        regionArray, and the children not seen before are deduplicated with
+        np.unique and become the next layer."""
+        size = spec.size
+        cells = spec.cells
+        count = len(tiles)
+        # neighbours[direction][cell] = the cell a tile there slides to, or -1 at the edge.
+        neighbours = np.full((4, cells), -1, dtype=np.int8)
+        for cell in range(cells):
+            y, x = divmod(cell, size)
+            for direction, (ny, nx) in enumerate(((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1))):
+                if 0 <= ny < size and 0 <= nx < size:
+                    neighbours[direction, cell] = ny * size + nx
+        full = (1 << cells) - 1
+        table = np.full(PatternDatabase.tableSize(count, spec), UNSEEN, dtype=np.uint8)
+        seen = np.zeros(len(table) * cells, dtype=bool)  # seen[rank * cells + lowest cell of the blank's region]
+
+        def lowestCell(regions):
+            return np.log2((regions & -regions).astype(np.float64)).astype(np.int64)  # Exact for powers of two.
+
+        layer = np.array([[spec.goalIndex[tile] for tile in tiles]], dtype=np.int8)
+        free = full & ~np.bitwise_or.reduce(np.int64(1) << layer[0].astype(np.int64))
+        regions = PatternDatabase.regionArray(np.array([1 << spec.goalIndex[BLANK]], dtype=np.int64),
+                                              np.array([free], dtype=np.int64), spec)
+        ranks = PatternDatabase.rankArray(layer, spec)
+        table[ranks] = 0
+        seen[ranks * cells + lowestCell(regions)] = True
+        distance = 0
+        while len(layer):  # While the last layer reached new states.
+            distance += 1
+            next_layer = []
+            next_regions = []
+            for start in range(0, len(layer), LAYER_CHUNK):
+                chunk = layer[start:start + LAYER_CHUNK]
+                chunk_regions = regions[start:start + LAYER_CHUNK]
+                free = np.full(len(chunk), full, dtype=np.int64)
+                for i in range(count):
+                    free &= ~(1 << chunk[:, i].astype(np.int64))
+                children = []
+                child_regions = []
+                for i in range(count):  # Try sliding each tile of the group into the blank's region.
+                    for direction in range(4):
+                        targets = neighbours[direction][chunk[:, i]]
+                        movable = targets >= 0
+                        movable[movable] = (chunk_regions[movable] >> targets[movable].astype(np.int64)) & 1 == 1
+                        child = chunk[movable]
+                        vacated = np.int64(1) << child[:, i].astype(np.int64)  # The blank is left where the tile was.
+                        child[:, i] = targets[movable]
+                        child_free = (free[movable] | vacated) & ~(np.int64(1) << child[:, i].astype(np.int64))
+                        children.append(child)
+                        child_regions.append(PatternDatabase.regionArray(vacated, child_free, spec))
+                children = np.concatenate(children)
+                child_regions = np.concatenate(child_regions)
+                ranks = PatternDatabase.rankArray(children, spec)
+                keys = ranks * cells + lowestCell(child_regions)
+                unseen = ~seen[keys]
+                keys, first = np.unique(keys[unseen], return_index=True)
+                seen[keys] = True
+                ranks = keys // cells
+                table[ranks[table[ranks] == UNSEEN]] = distance
+                next_layer.append(children[unseen][first])
+                next_regions.append(child_regions[unseen][first])
+            layer = np.concatenate(next_layer)
+            regions = np.concatenate(next_regions)
+        return bytearray(table)
+
+    @staticmethod
+    def build(partition=None, path=None, spec=DEFAULT_SPEC):
+        """Build the tables for `partition` on the spec's board, write them to
+        `path` and return the loaded pattern database."""
+        partition = partition or PatternDatabase.defaultPartition(spec)
+        path = path or PatternDatabase.defaultPath(spec)
+        tiles = [tile for group in partition for tile in group]
+        if len(tiles) != len(set(tiles)) or not set(tiles) <= set(range(1, spec.cells)) or BLANK in tiles:
+            raise ValueError(f'Pattern groups must be disjoint sets of tiles 1..{spec.cells - 1}.')
+        # Header: magic, version, board size, group count, the goal, then each group's size and tiles.
+        header = struct.pack('<5sBBB', MAGIC, FORMAT_VERSION, spec.size, len(partition))
+        header += struct.pack(f'<{spec.cells}B', *spec.goal)
+        for group in partition:
+            header += struct.pack(f'<B{len(group)}B', len(group), *group)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(header)
+            for group in partition:
+                file.write(PatternDatabase.buildTable(group, spec))
+        os.replace(temporary, path)  # Readers never see a half-written file.
+        return PatternDatabase.load(path, spec)
+
+    @staticmethod
+    def load(path=None, spec=None):
+        """Memory-map a pattern database file written by build(). If a spec
+        is given, the file must hold tables for its size and goal."""
+        path = path or PatternDatabase.defaultPath(spec or DEFAULT_SPEC)
+        with open(path, 'rb') as file:
+            source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size, groups = struct.unpack_from('<5sBBB', source, 0)
+        if magic != MAGIC:
+            source.close()
+            raise ValueError(f'{path} is not a pattern database.')
+        if version != FORMAT_VERSION:
+            source.close()
+            raise ValueError(f'{path} holds version {version} tables, expected version {FORMAT_VERSION}.')
+        offset = struct.calcsize('<5sBBB')
+        goal = source[offset:offset + size * size]
+        offset += size * size
+        fileSpec = PuzzleSpec(size, goal)
+        if spec is not None and spec != fileSpec:
+            source.close()
+            raise ValueError(f'{path} holds tables for {fileSpec}, not {spec}.')
+        partition = []
+        for _ in range(groups):
+            count = source[offset]
+            partition.append(tuple(source[offset + 1:offset + 1 + count]))
+            offset += 1 + count
+        view = memoryview(source)
+        tables = []
+        for group in partition:
+            length = PatternDatabase.tableSize(len(group), fileSpec)
+            tables.append(view[offset:offset + length])
+            offset += length
+        return PatternDatabase(partition, tables, source, fileSpec)
+
+    @staticmethod
+    def loadOrBuild(path=None, spec=DEFAULT_SPEC):
+        """Load the default pattern database of a spec, building it first if needed."""
+        path = path or PatternDatabase.defaultPath(spec)
+        if not os.path.exists(path):
+            print(f'Building the pattern database in {path}, this can take a few minutes...')
+            return PatternDatabase.build(path=path, spec=spec)
+        return PatternDatabase.load(path, spec)
+
+if __name__ == "__main__":
+    # Build the default pattern database: python patterndb.py [path [size]]
+    spec = PuzzleSpec.ofSize(int(sys.argv[2])) if len(sys.argv) > 2 else DEFAULT_SPEC
+    database = PatternDatabase.build(path=sys.argv[1] if len(sys.argv) > 1 else None, spec=spec)
+    print('Built', ', '.join(f'{len(tiles)}-tile' for tiles in database.partition), 'tables.')
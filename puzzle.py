@@ -1,165 +1,530 @@
-# made with fun! :)
-import random 
-
-DIFFICULTY = 50  # Set the number of random moves the puzzle starts with.
-SIZE = 4  # Define the board dimensions as NxN.
-BLANK = 0 # Define the blank tile
-UP = 'up' # Move up
-DOWN = 'down' # Move down
-LEFT = 'left' # Move left
-RIGHT = 'right' # Move right
-
-class Puzzle:
-    @staticmethod
-    def displayBoard(board):
-        """Display the tiles stored in a board on the screen in a bordered format."""
-        for y in range(SIZE):
-            print('+----' * SIZE + '+')
-            for x in range(SIZE):
-                if board[y * SIZE + x] == BLANK:
-                    print('|    ', end='')
-                else:
-                    print(f'| {str(board[y * SIZE + x]).rjust(2)} ', end='')
-            print('|')
-        print('+----' * SIZE + '+')
-
-    @staticmethod
-    def getNewBoard():
-        """Return a list that represents a new tile puzzle."""
-        board = []  # Initialize an empty list for the board.
-        for i in range(1, SIZE * SIZE):
-            board.append(i)  # Append tile numbers to the board.
-        board.append(BLANK)  # Append the blank tile at the end.
-        return board
-
-    @staticmethod
-    def findBlankSpace(board):
-        """Return the coordonates of the blank space's location."""
-        for x in range(SIZE):  # Loop through each column.
-            for y in range(SIZE):  # Loop through each row.
-                if board[y * SIZE + x] == BLANK:  # Check if the current tile is blank.
-                    return [x, y]  # Return the coordinates of the blank tile.
-                
-    @staticmethod
-    def makeMove(board, move):
-        """Make the move on the board."""
-        bx, by = Puzzle.findBlankSpace(board)  # Get the position of the blank tile.
-        blankIndex = by * SIZE + bx  # Calculate the index of the blank tile.
-        if move == UP:
-            tileIndex = (by + 1) * SIZE + bx
-        elif move == LEFT:
-            tileIndex = by * SIZE + (bx + 1)
-        elif move == DOWN:
-            tileIndex = (by - 1) * SIZE + bx
-        elif move == RIGHT:
-            tileIndex = by * SIZE + (bx - 1)
-        # Swap the tiles at blankIndex and tileIndex:
-        board[blankIndex], board[tileIndex] = board[tileIndex], board[blankIndex]
-
-    # NOTE: this is used for recurrsive DFS
-    @staticmethod
-    def undoMove(board, move):
-        """Do the opposite move of `move` to undo it on `board`."""
-        if move == UP:
-            Puzzle.makeMove(board, DOWN)
-        elif move == DOWN:
-            Puzzle.makeMove(board, UP)
-        elif move == LEFT:
-            Puzzle.makeMove(board, RIGHT)
-        elif move == RIGHT:
-            Puzzle.makeMove(board, LEFT)
-
-    @staticmethod
-    def getValidMoves(board, prevMove=None):
-        """Returns a list of the valid moves to make on this board. If
-        prevMove is provided, do not include the move that would undo it."""
-        blankx, blanky = Puzzle.findBlankSpace(board)
-        validMoves = []
-        if blanky != SIZE - 1 and prevMove != DOWN:
-            validMoves.append(UP)
-        if blankx != SIZE - 1 and prevMove != RIGHT:
-            validMoves.append(LEFT)
-        if blanky != 0 and prevMove != UP:
-            validMoves.append(DOWN)
-        if blankx != 0 and prevMove != LEFT:
-            validMoves.append(RIGHT)
-        return validMoves
-
-    @staticmethod
-    def getNewPuzzle():
-        """Get a new puzzle by making random slides from the solved state."""
-        board = Puzzle.getNewBoard()  # Start with a new solved board.
-        for i in range(DIFFICULTY):  # Perform a number of random moves to shuffle.
-            validMoves = Puzzle.getValidMoves(board)  # Get the valid moves.
-            Puzzle.makeMove(board, random.choice(validMoves))  # Randomly make a move.
-        return board
-
-    # Heuristic functions to estimate the cost to solve the puzzle.
-
-    # h1: Misplaced Tiles heuristic
-    @staticmethod
-    def misplacedTiles(board):
-        """Count the number of tiles that are not in the goal position."""
-        misplaced = 0  # Initialize count of misplaced tiles.
-        for i in range(len(board)):  # Loop through each tile in the board.
-            if board[i] != BLANK and board[i] != i + 1:  # Check if tile is misplaced.
-                misplaced += 1  # Increment the count if it's misplaced.
-        return misplaced  # Return the count of misplaced tiles.
-
-    # h2: Euclidean Distance heuristic
-    @staticmethod
-    def euclideanDistance(board):
-        # Σ(sqrt()(x - target_x)² + (y - target_y)²)
-        """Calculate the Euclidean distance heuristic."""
-        distance = 0  # Initialize total distance to 0.
-        for i in range(len(board)):  # Loop through each tile in the board.
-            if board[i] != BLANK:  # Ignore the blank tile.
-                x, y = divmod(i, SIZE)  # Get current tile's coordinates.
-                target_x, target_y = divmod(board[i] - 1, SIZE)  # Get target coordinates.
-                distance += ((x - target_x) ** 2 + (y - target_y) ** 2) ** 0.5  # Add Euclidean distance to total.
-        return distance
-    
-    # h3: Manhattan distance heuristic
-    @staticmethod
-    def manhattanDistance(board):
-        # Σ(|x - target_x| + |y - target_y|)
-        """Calculate the Manhattan distance heuristic."""
-        distance = 0  # Initialize total distance to 0.
-        for i in range(len(board)):  # Loop through each tile in the board.
-            if board[i] != BLANK:  # Ignore the blank tile.
-                x, y = divmod(i, SIZE)  # Get current tile's coordinates.
-                target_x, target_y = divmod(board[i] - 1, SIZE)  # Get target coordinates.
-                distance += abs(x - target_x) + abs(y - target_y)  # Add the distance to the total.
-        return distance 
-    
-    # h4: Number of tiles out of row and column heuristics
-    @staticmethod
-    def rowColumnHeuristic(board):
-        # (Number of tiles out of row) + (Number of tiles out of column)
-        """Calculate the number of tiles out of row and column."""
-        out_of_row = 0  # Count of tiles out of their correct row
-        out_of_col = 0  # Count of tiles out of their correct column
-        for i in range(len(board)):  # Loop through each tile in the board
-            if board[i] != BLANK:  # Ignore the blank tile
-                x, y = divmod(i, SIZE)  # Current tile's coordinates
-                target_x, target_y = divmod(board[i] - 1, SIZE)  # Target coordinates
-                if y != target_y: # Check if the tile is out of its row
-                    out_of_row += 1
-                if x != target_x: # Check if the tile is out of its column
-                    out_of_col += 1
-        return out_of_row + out_of_col
-    
-    # h5: Linear Conflict heuristic
-    @staticmethod
-    def linearConflict(board):
-        # Σ(conflicts) + Manhattan Distance
-        """Calculate the linear conflict heuristic."""
-        conflict = 0  # Initialize conflict count to 0.
-        for row in range(SIZE):  # Loop through each row.
-            for col in range(SIZE):  # Loop through each column.
-                tile = board[row * SIZE + col]  # Get the current tile.
-                if tile != BLANK and tile != row * SIZE + col + 1:  # Check if the tile is out of place.
-                    target_x, target_y = divmod(tile - 1, SIZE)  # Get target coordinates.
-                    if target_y == col:  # If the tile is in the same column.
-                        conflict += 2  # Each pair of tiles in conflict adds 2 to the conflict count.
-        return conflict + Puzzle.manhattanDistance(board)
\ No newline at end of file
+# made with fun! :)
+import random 
+
+try:
+    import numpy as np  # Only needed to score many boards at once.
+except ImportError:
+    np = None
+
+DIFFICULTY = 50  # Set the default number of random moves the puzzle starts with.
+SIZE = 4  # Define the default board dimensions as NxN.
+BLANK = 0 # Define the blank tile
+UP = 'up' # Move up
+DOWN = 'down' # Move down
+LEFT = 'left' # Move left
+RIGHT = 'right' # Move right
+OPPOSITE_MOVES = {UP: DOWN, DOWN: UP, LEFT: RIGHT, RIGHT: LEFT}  # The move that undoes each move.
+
+def buildMoveTables(size, tileBits):
+    """Precompute the moves available from every blank position on a
+    size x size board. Returns (validMoves, packedMoves): validMoves[blankIndex][prevMove]
+    is the tuple of valid moves, and packedMoves[blankIndex][prevMove] holds
+    (move, tileIndex, tileShift, blankShift) entries for packed boards."""
+    validMoves = []
+    packedMoves = []
+    for blankIndex in range(size * size):
+        by, bx = divmod(blankIndex, size)  # Row and column of the blank.
+        moves = []  # (move, index of the tile that slides into the blank)
+        if by != size - 1:
+            moves.append((UP, blankIndex + size))
+        if bx != size - 1:
+            moves.append((LEFT, blankIndex + 1))
+        if by != 0:
+            moves.append((DOWN, blankIndex - size))
+        if bx != 0:
+            moves.append((RIGHT, blankIndex - 1))
+        valid = {}
+        packed = {}
+        for prevMove in (None, UP, DOWN, LEFT, RIGHT):
+            # Skip the move that would undo prevMove.
+            allowed = [(move, tileIndex) for move, tileIndex in moves if OPPOSITE_MOVES.get(prevMove) != move]
+            valid[prevMove] = tuple(move for move, tileIndex in allowed)
+            packed[prevMove] = tuple((move, tileIndex, tileIndex * tileBits, blankIndex * tileBits)
+                                     for move, tileIndex in allowed)
+        validMoves.append(valid)
+        packedMoves.append(packed)
+    return validMoves, packedMoves
+
+class PuzzleSpec:
+    """The geometry of a puzzle: its size, its solved layout and the tables
+    derived from them. Every Puzzle, heuristic and Search routine takes a spec,
+    so boards of different sizes or goals can be solved side by side in one
+    process. A spec is not changed after it is built, so it can be shared.
+    The per-tile heuristic costs are tabulated as table[tile][cell], the cost
+    of `tile` standing on `cell`, with a row of zeros for the blank."""
+
+    def __init__(self, size=SIZE, goal=None, difficulty=DIFFICULTY):
+        if size < 2:
+            raise ValueError(f'A board must be at least 2x2, not {size}x{size}.')
+        self.size = size
+        self.cells = size * size
+        self.difficulty = difficulty  # Number of random moves a new puzzle starts with.
+        if goal is None:
+            goal = list(range(1, self.cells)) + [BLANK]  # Tiles in order with the blank last.
+        self.goal = tuple(goal)
+        if sorted(self.goal) != list(range(self.cells)):
+            raise ValueError(f'The goal must be a permutation of 0..{self.cells - 1}.')
+        self.tileBits = (self.cells - 1).bit_length()  # Bits used per tile in a packed board (4 on a 4x4 board).
+        self.tileMask = (1 << self.tileBits) - 1  # Mask that reads a single tile out of a packed board.
+        self.goalIndex = [0] * self.cells  # goalIndex[tile] = cell of the tile on the solved board.
+        for i in range(self.cells):
+            self.goalIndex[self.goal[i]] = i
+        self.goalCoordinates = [divmod(i, size) for i in self.goalIndex]  # (row, column) of each tile's goal.
+        self.misplacedTable = self.buildTable(lambda x, y, target_x, target_y: (x, y) != (target_x, target_y))
+        self.euclideanTable = self.buildTable(lambda x, y, target_x, target_y: ((x - target_x) ** 2 + (y - target_y) ** 2) ** 0.5)
+        self.manhattanTable = self.buildTable(lambda x, y, target_x, target_y: abs(x - target_x) + abs(y - target_y))
+        self.rowColumnTable = self.buildTable(lambda x, y, target_x, target_y: (x != target_x) + (y != target_y))
+        self._arrays = {}  # NumPy copies of the tables, made on first use.
+        # Tiles numbered by their order on the solved board, which then has no inversions.
+        self.goalOrder = [0] * self.cells
+        for order, tile in enumerate(tile for tile in self.goal if tile != BLANK):
+            self.goalOrder[tile] = order
+        # The same, reading the solved board column by column.
+        self.goalColumnOrder = [0] * self.cells
+        columnMajor = [self.goal[row * size + column] for column in range(size) for row in range(size)]
+        for order, tile in enumerate(tile for tile in columnMajor if tile != BLANK):
+            self.goalColumnOrder[tile] = order
+        # Every row, then every column, as (its cells in order, lineGoals) where lineGoals[tile] is the
+        # position along the line of a tile whose goal lies on it, else None.
+        lines = []
+        for row in range(size):
+            lineGoals = tuple(column if tile != BLANK and goalRow == row else None
+                              for tile, (goalRow, column) in enumerate(self.goalCoordinates))
+            lines.append((tuple(row * size + column for column in range(size)), lineGoals))
+        for column in range(size):
+            lineGoals = tuple(row if tile != BLANK and goalColumn == column else None
+                              for tile, (row, goalColumn) in enumerate(self.goalCoordinates))
+            lines.append((tuple(row * size + column for row in range(size)), lineGoals))
+        self.lines = tuple(lines)
+        self.goalState = 0  # The solved board, packed.
+        for i in range(self.cells):
+            self.goalState |= self.goal[i] << (i * self.tileBits)
+        self.validMoves, self.packedMoves = buildMoveTables(size, self.tileBits)
+        self.moveOffsets = {UP: size, LEFT: 1, DOWN: -size, RIGHT: -1}  # Index offset from the blank to the tile that moves.
+
+    def buildTable(self, cost):
+        """Return table[tile][cell] = cost(x, y, target_x, target_y) of every
+        tile on every cell, where (x, y) is the cell's row and column and
+        (target_x, target_y) the tile's goal. The blank costs nothing."""
+        table = [tuple(0 for _ in range(self.cells))]  # The blank.
+        for tile in range(1, self.cells):
+            target_x, target_y = self.goalCoordinates[tile]
+            table.append(tuple(cost(*divmod(cell, self.size), target_x, target_y) for cell in range(self.cells)))
+        return tuple(table)
+
+    def tableArray(self, name):
+        """Return the table called `name` (e.g. 'manhattanTable') as a NumPy array."""
+        if name not in self._arrays:
+            if np is None:
+                raise ImportError('Scoring boards in batches needs NumPy: pip install numpy')
+            self._arrays[name] = np.array(getattr(self, name))
+        return self._arrays[name]
+
+    def __eq__(self, other):
+        return isinstance(other, PuzzleSpec) and (self.size, self.goal) == (other.size, other.goal)
+
+    def __hash__(self):
+        return hash((self.size, self.goal))
+
+    def __repr__(self):
+        return f'PuzzleSpec({self.size}, {list(self.goal)})'
+
+    @staticmethod
+    def ofSize(size):
+        """Return the shared spec of a size x size board with the usual goal."""
+        if size not in _specs:
+            _specs[size] = PuzzleSpec(size)
+        return _specs[size]
+
+# Specs with the usual goal, by size.
+_specs = {}
+
+# Extra moves of the conflicts in a line, by the goal positions of its tiles in the order they stand.
+_lineConflicts = {}
+DEFAULT_SPEC = PuzzleSpec.ofSize(SIZE)  # Used when no spec is given.
+
+# The default spec's tables, for callers written before specs existed.
+TILE_BITS = DEFAULT_SPEC.tileBits
+TILE_MASK = DEFAULT_SPEC.tileMask
+VALID_MOVES, PACKED_MOVES = DEFAULT_SPEC.validMoves, DEFAULT_SPEC.packedMoves
+MOVE_OFFSETS = DEFAULT_SPEC.moveOffsets
+
+class Puzzle:
+    @staticmethod
+    def displayBoard(board, spec=DEFAULT_SPEC):
+        """Display the tiles stored in a board on the screen in a bordered format."""
+        size = spec.size
+        for y in range(size):
+            print('+----' * size + '+')
+            for x in range(size):
+                if board[y * size + x] == BLANK:
+                    print('|    ', end='')
+                else:
+                    print(f'| {str(board[y * size + x]).rjust(2)} ', end='')
+            print('|')
+        print('+----' * size + '+')
+
+    @staticmethod
+    def getNewBoard(spec=DEFAULT_SPEC):
+        """Return a list that represents a new tile puzzle."""
+        return list(spec.goal)  # A copy of the solved board, so the caller can change it.
+
+    @staticmethod
+    def findBlankSpace(board, spec=DEFAULT_SPEC):
+        """Return the coordonates of the blank space's location."""
+        size = spec.size
+        for x in range(size):  # Loop through each column.
+            for y in range(size):  # Loop through each row.
+                if board[y * size + x] == BLANK:  # Check if the current tile is blank.
+                    return [x, y]  # Return the coordinates of the blank tile.
+                
+    @staticmethod
+    def findBlankIndex(board, spec=DEFAULT_SPEC):
+        """Return the index of the blank space in a list or packed board."""
+        if isinstance(board, int):
+            for i in range(spec.cells):  # Scan the packed tiles for the blank.
+                if (board >> (i * spec.tileBits)) & spec.tileMask == BLANK:
+                    return i
+        return board.index(BLANK)
+
+    @staticmethod
+    def packBoard(board, spec=DEFAULT_SPEC):
+        """Return the board encoded as an integer with spec.tileBits bits per tile."""
+        if isinstance(board, int):
+            return board  # Already packed.
+        tileBits = spec.tileBits
+        state = 0
+        for i in range(len(board)):
+            state |= board[i] << (i * tileBits)  # Tile i lives in bits [i * tileBits, (i + 1) * tileBits).
+        return state
+
+    @staticmethod
+    def unpackBoard(state, spec=DEFAULT_SPEC):
+        """Return the list board encoded in a packed board."""
+        tileBits, tileMask = spec.tileBits, spec.tileMask
+        return [(state >> (i * tileBits)) & tileMask for i in range(spec.cells)]
+
+    @staticmethod
+    def getPackedSuccessors(state, blankIndex, prevMove=None, spec=DEFAULT_SPEC):
+        """Return (move, child state, child blank index, moved tile) for every
+        valid move on a packed board whose blank is at blankIndex. The moved
+        tile goes from the child blank index to blankIndex."""
+        tileMask = spec.tileMask
+        successors = []
+        for move, tileIndex, tileShift, blankShift in spec.packedMoves[blankIndex][prevMove]:
+            tile = (state >> tileShift) & tileMask  # The tile that slides into the blank.
+            # The blank is 0, so moving the tile is an add at its new place and a subtract at its old one:
+            successors.append((move, state + (tile << blankShift) - (tile << tileShift), tileIndex, tile))
+        return successors
+
+    @staticmethod
+    def makeMove(board, move, spec=DEFAULT_SPEC):
+        """Make the move on the board."""
+        blankIndex = board.index(BLANK)  # Get the index of the blank tile.
+        tileIndex = blankIndex + spec.moveOffsets[move]  # Get the index of the tile that slides.
+        # Swap the tiles at blankIndex and tileIndex:
+        board[blankIndex], board[tileIndex] = board[tileIndex], board[blankIndex]
+
+    # NOTE: this is used for recurrsive DFS
+    @staticmethod
+    def undoMove(board, move, spec=DEFAULT_SPEC):
+        """Do the opposite move of `move` to undo it on `board`."""
+        Puzzle.makeMove(board, Puzzle.oppositeMove(move), spec)
+
+    @staticmethod
+    def oppositeMove(move):
+        """Return the move that undoes `move`."""
+        return OPPOSITE_MOVES[move]
+
+    @staticmethod
+    def getValidMoves(board, prevMove=None, spec=DEFAULT_SPEC):
+        """Returns a tuple of the valid moves to make on this board. If
+        prevMove is provided, do not include the move that would undo it."""
+        return spec.validMoves[Puzzle.findBlankIndex(board, spec)][prevMove]
+
+    @staticmethod
+    def validateBoard(board, spec=DEFAULT_SPEC):
+        """Check a board supplied from outside: it must hold spec.cells whole
+        numbers that are a permutation of 0..spec.cells - 1, so there is
+        exactly one blank. Returns the board as a list, or raises ValueError."""
+        if isinstance(board, int) and not isinstance(board, bool):
+            board = Puzzle.unpackBoard(board, spec)
+        try:
+            tiles = list(board)
+        except TypeError:
+            raise ValueError(f'A board must be a sequence of tiles, not {type(board).__name__}.')
+        if len(tiles) != spec.cells:
+            raise ValueError(f'A board must have {spec.cells} tiles, not {len(tiles)}.')
+        for tile in tiles:
+            if not isinstance(tile, int) or isinstance(tile, bool):
+                raise ValueError(f'Tiles must be whole numbers, not {tile!r}.')
+        if sorted(tiles) != list(range(spec.cells)):
+            if tiles.count(BLANK) != 1:
+                raise ValueError(f'A board must have exactly one blank ({BLANK}), not {tiles.count(BLANK)}.')
+            raise ValueError(f'The tiles must be a permutation of 0..{spec.cells - 1}.')
+        return tiles
+
+    @staticmethod
+    def isSolvable(board, spec=DEFAULT_SPEC):
+        """Return True if the board can reach the solved board. A slide never
+        changes the parity of (inversions + (size - 1) * blank row): sideways
+        slides change neither, and vertical ones pass a tile over size - 1
+        others while moving the blank one row. Tiles are numbered by their
+        order on the solved board, which then has no inversions, so the board
+        is solvable when that parity matches the solved board's."""
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, spec)
+        tiles = [spec.goalOrder[tile] for tile in board if tile != BLANK]
+        inversions = Puzzle.countInversions(tiles)
+        blankRow = Puzzle.findBlankIndex(board, spec) // spec.size
+        goalRow = spec.goalIndex[BLANK] // spec.size
+        return (inversions + (spec.size - 1) * blankRow) % 2 == ((spec.size - 1) * goalRow) % 2
+
+    @staticmethod
+    def countInversions(tiles):
+        """Count the pairs of tiles in the wrong order."""
+        inversions = 0
+        for i in range(len(tiles)):
+            for j in range(i + 1, len(tiles)):
+                if tiles[i] > tiles[j]:
+                    inversions += 1
+        return inversions
+
+    @staticmethod
+    def getNewPuzzle(spec=DEFAULT_SPEC):
+        """Get a new puzzle by making random slides from the solved state."""
+        board = Puzzle.getNewBoard(spec)  # Start with a new solved board.
+        for i in range(spec.difficulty):  # Perform a number of random moves to shuffle.
+            validMoves = Puzzle.getValidMoves(board, None, spec)  # Get the valid moves.
+            Puzzle.makeMove(board, random.choice(validMoves), spec)  # Randomly make a move.
+        return board
+
+    # Heuristic functions to estimate the cost to solve the puzzle.
+
+    # h1: Misplaced Tiles heuristic
+    @staticmethod
+    def misplacedTiles(board, spec=DEFAULT_SPEC):
+        """Count the number of tiles that are not in the goal position."""
+        table = spec.misplacedTable  # table[tile][cell] is 1 if the tile is misplaced there.
+        misplaced = 0  # Initialize count of misplaced tiles.
+        for i in range(len(board)):  # Loop through each tile in the board.
+            misplaced += table[board[i]][i]  # The blank is never counted.
+        return misplaced  # Return the count of misplaced tiles.
+
+    # h2: Euclidean Distance heuristic
+    @staticmethod
+    def euclideanDistance(board, spec=DEFAULT_SPEC):
+        # Σ(sqrt()(x - target_x)² + (y - target_y)²)
+        """Calculate the Euclidean distance heuristic."""
+        table = spec.euclideanTable  # table[tile][cell] is the tile's straight-line distance from there to its goal.
+        distance = 0  # Initialize total distance to 0.
+        for i in range(len(board)):  # Loop through each tile in the board.
+            distance += table[board[i]][i]  # Add Euclidean distance to total; the blank adds nothing.
+        return distance
+    
+    # h3: Manhattan distance heuristic
+    @staticmethod
+    def manhattanDistance(board, spec=DEFAULT_SPEC):
+        # Σ(|x - target_x| + |y - target_y|)
+        """Calculate the Manhattan distance heuristic."""
+        table = spec.manhattanTable  # table[tile][cell] is the tile's row and column distance from there to its goal.
+        distance = 0  # Initialize total distance to 0.
+        for i in range(len(board)):  # Loop through each tile in the board.
+            distance += table[board[i]][i]  # Add the distance to the total; the blank adds nothing.
+        return distance 
+    
+    # h4: Number of tiles out of row and column heuristics
+    @staticmethod
+    def rowColumnHeuristic(board, spec=DEFAULT_SPEC):
+        # (Number of tiles out of row) + (Number of tiles out of column)
+        """Calculate the number of tiles out of row and column."""
+        table = spec.rowColumnTable  # table[tile][cell] counts whether the tile is out of its row and out of its column.
+        out_of_place = 0  # Count of tiles out of their correct row plus those out of their correct column
+        for i in range(len(board)):  # Loop through each tile in the board
+            out_of_place += table[board[i]][i]  # The blank is never counted
+        return out_of_place
+    
+    # h5: Linear Conflict heuristic
+    @staticmethod
+    def linearConflict(board, spec=DEFAULT_SPEC):
+        # Σ(conflicts) + Manhattan Distance
+        """Calculate the linear conflict heuristic. Two tiles are in conflict
+        when both are on their goal row (or column) in the reverse of their
+        goal order: one of them has to step out of the line and back, two
+        moves Manhattan distance does not count. Each line adds two moves for
+        every tile outside its longest run of tiles already in goal order."""
+        conflict = 0  # Initialize conflict count to 0.
+        for cells, lineGoals in spec.lines:  # Loop through each row and column.
+            conflict += Puzzle.lineConflict([board[cell] for cell in cells], lineGoals)
+        return conflict + Puzzle.manhattanDistance(board, spec)
+
+    @staticmethod
+    def lineConflict(tiles, lineGoals):
+        """Return the extra moves the conflicts of one line cost: `tiles` are
+        the tiles along the line in order, and lineGoals[tile] the position
+        along it of a tile whose goal lies on it, else None."""
+        goals = tuple(lineGoals[tile] for tile in tiles if lineGoals[tile] is not None)
+        if goals not in _lineConflicts:
+            longest = [1] * len(goals)  # longest[i] = longest run in goal order ending with goals[i].
+            for i in range(len(goals)):
+                for j in range(i):
+                    if goals[j] < goals[i]:
+                        longest[i] = max(longest[i], longest[j] + 1)
+            _lineConflicts[goals] = 2 * (len(goals) - max(longest, default=0))
+        return _lineConflicts[goals]
+
+    @staticmethod
+    def inversionDistance(board, spec=DEFAULT_SPEC):
+        """Calculate the inversion distance heuristic. Read row by row, the
+        tiles (numbered by their order on the solved board) only change order
+        when a tile moves vertically, passing size - 1 others: that changes the
+        number of inversions by at most size - 1, and by an amount with the
+        same parity. So undoing the inversions takes at least a known number
+        of vertical moves; reading column by column bounds the horizontal
+        moves the same way, and the two add up."""
+        size = spec.size
+        rows = [spec.goalOrder[tile] for tile in board if tile != BLANK]
+        columns = [spec.goalColumnOrder[board[row * size + column]] for column in range(size) for row in range(size)
+                   if board[row * size + column] != BLANK]
+        return Puzzle.inversionMoves(Puzzle.countInversions(rows), spec) + Puzzle.inversionMoves(Puzzle.countInversions(columns), spec)
+
+    @staticmethod
+    def inversionMoves(inversions, spec=DEFAULT_SPEC):
+        """Return the fewest moves that change the number of inversions by
+        `inversions`, each by at most size - 1 with the parity of size - 1."""
+        step = spec.size - 1
+        moves = -(-inversions // step)  # Rounded up.
+        if step % 2 and moves % 2 != inversions % 2:
+            moves += 1  # An odd step count changes the parity every move.
+        return moves
+
+    @staticmethod
+    def maxHeuristic(*heuristics):
+        """Return a heuristic that takes the largest of several admissible
+        ones, and so is admissible and at least as strong as each."""
+        def combined(board, spec=DEFAULT_SPEC):
+            return max(heuristic(board, spec) for heuristic in heuristics)
+        combined.__name__ = f"max({', '.join(heuristic.__name__ for heuristic in heuristics)})"
+        specs = [heuristic.spec for heuristic in heuristics if getattr(heuristic, 'spec', None)]
+        if specs:
+            combined.spec = specs[0]  # Tied to one goal, like the tables of its parts.
+        if not all(Puzzle.isIntegral(heuristic) for heuristic in heuristics):
+            combined.fractional = True  # Takes non-integer values wherever one of its parts wins.
+        return combined
+
+    @staticmethod
+    def isIntegral(heuristic):
+        """Whether `heuristic` only ever returns integers. Heuristics that
+        may not, like Euclidean distance, are marked fractional."""
+        return not getattr(heuristic, 'fractional', False)
+
+    # Incremental heuristics: a slide only moves one tile, so the child's value
+    # is the parent's value h corrected for `tile` going from fromIndex to
+    # toIndex. `board` is the board after the move (list or packed).
+
+    @staticmethod
+    def misplacedTilesDelta(board, h, tile, fromIndex, toIndex, spec=DEFAULT_SPEC):
+        """Update misplacedTiles after moving `tile` from fromIndex to toIndex."""
+        costs = spec.misplacedTable[tile]
+        return h - costs[fromIndex] + costs[toIndex]
+
+    @staticmethod
+    def euclideanDistanceDelta(board, h, tile, fromIndex, toIndex, spec=DEFAULT_SPEC):
+        """Update euclideanDistance after moving `tile` from fromIndex to toIndex."""
+        costs = spec.euclideanTable[tile]
+        return h - costs[fromIndex] + costs[toIndex]
+
+    @staticmethod
+    def manhattanDistanceDelta(board, h, tile, fromIndex, toIndex, spec=DEFAULT_SPEC):
+        """Update manhattanDistance after moving `tile` from fromIndex to toIndex."""
+        costs = spec.manhattanTable[tile]
+        return h - costs[fromIndex] + costs[toIndex]
+
+    @staticmethod
+    def rowColumnHeuristicDelta(board, h, tile, fromIndex, toIndex, spec=DEFAULT_SPEC):
+        """Update rowColumnHeuristic after moving `tile` from fromIndex to toIndex."""
+        costs = spec.rowColumnTable[tile]
+        return h - costs[fromIndex] + costs[toIndex]
+
+    @staticmethod
+    def linearConflictDelta(board, h, tile, fromIndex, toIndex, spec=DEFAULT_SPEC):
+        """Update linearConflict after moving `tile` from fromIndex to toIndex.
+        A vertical move keeps the order of every column and takes the tile
+        from one row to another, so only those two rows are counted again; a
+        horizontal move likewise only changes two columns."""
+        size = spec.size
+        if fromIndex % size == toIndex % size:
+            changed = (spec.lines[fromIndex // size], spec.lines[toIndex // size])
+        else:
+            changed = (spec.lines[size + fromIndex % size], spec.lines[size + toIndex % size])
+        h = Puzzle.manhattanDistanceDelta(board, h, tile, fromIndex, toIndex, spec)
+        for cells, lineGoals in changed:
+            if isinstance(board, int):
+                tiles = [(board >> (cell * spec.tileBits)) & spec.tileMask for cell in cells]
+            else:
+                tiles = [board[cell] for cell in cells]
+            before = [tile if cell == fromIndex else BLANK if cell == toIndex else t for cell, t in zip(cells, tiles)]
+            h += Puzzle.lineConflict(tiles, lineGoals) - Puzzle.lineConflict(before, lineGoals)
+        return h
+
+    @staticmethod
+    def getHeuristicDelta(heuristic):
+        """Return the incremental version of `heuristic`, or None if it only
+        supports evaluating a whole board."""
+        return getattr(heuristic, 'delta', None)
+
+    # Batch heuristics: score many boards in one call with NumPy.
+
+    @staticmethod
+    def unpackBoards(states, spec=DEFAULT_SPEC):
+        """Return an N x spec.cells NumPy array of the boards in a sequence of
+        packed states. States that fit in 64 bits are unpacked with vector
+        shifts; larger boards are unpacked one at a time."""
+        if np is None:
+            raise ImportError('Scoring boards in batches needs NumPy: pip install numpy')
+        if spec.cells * spec.tileBits > 64:
+            return np.array([Puzzle.unpackBoard(state, spec) for state in states], dtype=np.intp).reshape(-1, spec.cells)
+        shifts = np.arange(spec.cells, dtype=np.uint64) * np.uint64(spec.tileBits)
+        packed = np.asarray(states, dtype=np.uint64).reshape(-1, 1)
+        return ((packed >> shifts) & np.uint64(spec.tileMask)).astype(np.intp)
+
+    @staticmethod
+    def heuristicBatch(boards, heuristic, spec=DEFAULT_SPEC):
+        """Return a NumPy array with the heuristic of every row of `boards`, an
+        N x spec.cells array (or anything NumPy can turn into one). Heuristics
+        that are a sum of per-tile costs are computed with one table lookup
+        per tile for the whole batch; others are evaluated board by board."""
+        if np is None:
+            raise ImportError('Scoring boards in batches needs NumPy: pip install numpy')
+        boards = np.asarray(boards, dtype=np.intp).reshape(-1, spec.cells)
+        table = getattr(heuristic, 'table', None)
+        if table is None:
+            return np.array([heuristic(list(board), spec) for board in boards.tolist()])
+        costs = spec.tableArray(table)
+        return costs[boards, np.arange(spec.cells)].sum(axis=1)  # costs[tile][cell] for every tile of every board.
+
+# Register the incremental version of each heuristic on the heuristic itself.
+Puzzle.misplacedTiles.delta = Puzzle.misplacedTilesDelta
+Puzzle.euclideanDistance.delta = Puzzle.euclideanDistanceDelta
+Puzzle.manhattanDistance.delta = Puzzle.manhattanDistanceDelta
+Puzzle.rowColumnHeuristic.delta = Puzzle.rowColumnHeuristicDelta
+Puzzle.linearConflict.delta = Puzzle.linearConflictDelta
+
+# Mark the heuristics whose values are not always integers.
+Puzzle.euclideanDistance.fractional = True
+
+# Register the [tile][cell] cost table of each heuristic that is a sum of per-tile costs.
+Puzzle.misplacedTiles.table = 'misplacedTable'
+Puzzle.euclideanDistance.table = 'euclideanTable'
+Puzzle.manhattanDistance.table = 'manhattanTable'
+Puzzle.rowColumnHeuristic.table = 'rowColumnTable'
+
+# Heuristics by name, for callers that choose one at run time.
+HEURISTICS = {heuristic.__name__: heuristic for heuristic in (
+    Puzzle.misplacedTiles,
+    Puzzle.euclideanDistance,
+    Puzzle.manhattanDistance,
+    Puzzle.rowColumnHeuristic,
+    Puzzle.linearConflict,
+    Puzzle.inversionDistance,
+)}
@@ -1,264 +1,1017 @@
-import os
-from puzzle import Puzzle
-import time 
-from collections import deque
-import heapq
-
-class Search:
-    # A* solution with a chosen heuristic
-    @staticmethod
-    def Astar(board, heuristic):
-        """Use A* to solve the puzzle with the specified heuristic."""
-        print(f'\n>>>Attempting to solve the puzzle using A* with {heuristic.__name__}...')
-        start_state = tuple(board)
-        goal_state = tuple(Puzzle.getNewBoard())
-
-        # Initialize a priority queue with (cost + heuristic, cost so far, moves made, board state)
-        timer = time.time()
-        priority_queue = []
-        heapq.heappush(priority_queue, (0 + heuristic(start_state), 0, [], start_state))
-        visited = set()
-        expanded_nodes = 0
-        max_fringe_size = 0
-
-        while priority_queue:  # While there are states to explore in the queue.
-            estimated_cost, cost_so_far, moves_made, current_state = heapq.heappop(priority_queue)  # Pop the state with the lowest cost.
-            expanded_nodes += 1  # Increment the expanded nodes counter.
-            max_fringe_size = max(max_fringe_size, len(priority_queue))  # Update max fringe size.
-
-            if current_state == goal_state:  # If the current state is the goal state.
-                # print the moves made
-                for move in moves_made:
-                    time.sleep(0.5)
-                    os.system('cls' if os.name == 'nt' else 'clear')
-                    Puzzle.makeMove(board, move)
-                    Puzzle.displayBoard(board)
-                    print()
-                print('Solved in', len(moves_made), 'moves:')  # Print the number of moves taken to solve.
-                print(', '.join(moves_made))  # Print the moves made.
-                return True, len(moves_made), expanded_nodes, max_fringe_size, time.time() - timer  # Return success and relevant statistics.
-
-            if current_state in visited:  # If the state has already been visited.
-                continue  # Skip to the next state in the queue.
-            visited.add(current_state)  # Add the current state to the visited set.
-
-            for move in Puzzle.getValidMoves(current_state):  # For each valid move from the current state.
-                new_state = list(current_state)  # Create a new list for the new state.
-                Puzzle.makeMove(new_state, move)  # Make the move on the new state.
-                new_state_tuple = tuple(new_state)  # Convert the new state to a tuple.
-                new_cost = cost_so_far + 1  # Increment the cost of the new state.
-                heuristic_value = heuristic(new_state)  # Calculate the heuristic for the new state.
-
-                if new_state_tuple not in visited:  # If the new state has not been visited.
-                    # Push the new state into the priority queue with its total cost:
-                    heapq.heappush(priority_queue, (new_cost + heuristic_value, new_cost, moves_made + [move], new_state_tuple))
-
-        return False, 0, expanded_nodes, max_fringe_size, time.time() - timer  # Unable to find a solution.
-    
-    # BFS
-    @staticmethod
-    def BFS(board, timeout=10):
-        """Attempt to solve the puzzle using Breadth-First Search."""
-        print('\n>>>Attempting to solve the puzzle using BFS...')
-        start_state = tuple(board)
-        goal_state = tuple(Puzzle.getNewBoard())
-
-        # Initialize a queue with (board state, moves made, depth).
-        timer = time.time()
-        queue = deque([(start_state, [], 0)])  
-        visited = set()
-        expanded_nodes = 0
-        max_fringe_size = 0
-
-        while queue:  # While there are states to explore in the queue.
-            # Check for timeout
-            if time.time() - timer > timeout:
-                print("Timeout")
-                return False, 0, expanded_nodes, max_fringe_size, time.time() - timer
-            
-            current_state, moves_made, depth = queue.popleft()  # Dequeue the state.
-            expanded_nodes += 1  # Increment the expanded nodes counter.
-
-            # Update max fringe size
-            max_fringe_size = max(max_fringe_size, len(queue))
-
-            if current_state == goal_state:  # If the current state is the goal state.
-                # print the moves made
-                for move in moves_made:
-                    time.sleep(0.5)
-                    os.system('cls' if os.name == 'nt' else 'clear')
-                    Puzzle.makeMove(board, move)
-                    Puzzle.displayBoard(board)
-                    print()
-                print('Solved in', len(moves_made), 'moves:')  # Print the number of moves taken to solve.
-                print(', '.join(moves_made))  # Print the moves made.
-                return True, len(moves_made), expanded_nodes, max_fringe_size, time.time() - timer  # Return success and relevant statistics.
-
-            if current_state in visited:  # If the state has already been visited.
-                continue  # Skip to the next state in the queue.
-            visited.add(current_state)  # Add the current state to the visited set.
-
-            for move in Puzzle.getValidMoves(current_state):  # For each valid move from the current state.
-                new_state = list(current_state)  # Create a new list for the new state.
-                Puzzle.makeMove(new_state, move)  # Make the move on the new state.
-                new_state_tuple = tuple(new_state)  # Convert the new state to a tuple.
-
-                if new_state_tuple not in visited:  # If the new state has not been visited.
-                    # Enqueue the new state with its moves and increment depth:
-                    queue.append((new_state_tuple, moves_made + [move], depth + 1))
-
-        return False, 0, expanded_nodes, max_fringe_size, time.time() - timer  # Unable to find a solution.
-    
-    # DFS - normal
-    @staticmethod
-    def DFS(board, timeout=10):
-        """Attempt to solve the puzzle using Depth-First Search."""
-        print('\n>>> Attempting to solve the puzzle using DFS...')
-        start_state = tuple(board)
-        goal_state = tuple(Puzzle.getNewBoard())
-
-        timer = time.time()
-        stack = [(start_state, [], 0)]
-        visited = set()
-        expanded_nodes = 0
-        max_fringe_size = 0
-
-        while stack:  # While there are states to explore in the stack
-            # Check for timeout
-            if time.time() - timer > timeout:
-                print("Timeout")
-                return False, 0, expanded_nodes, max_fringe_size, time.time() - timer
-            
-            current_state, moves_made, depth = stack.pop()  # Pop the last state from the stack
-            expanded_nodes += 1  # Increment the expanded nodes counter
-
-            # Update max fringe size
-            max_fringe_size = max(max_fringe_size, len(stack))
-
-            if current_state == goal_state:  # If the current state is the goal state
-                # print the moves made
-                for move in moves_made:
-                    time.sleep(0.5)
-                    os.system('cls' if os.name == 'nt' else 'clear')
-                    Puzzle.makeMove(board, move)
-                    Puzzle.displayBoard(board)
-                    print()
-                print('Solved in', len(moves_made), 'moves:')  # Print the number of moves taken to solve
-                print(', '.join(moves_made))  # Print the moves made
-                return True, len(moves_made), expanded_nodes, max_fringe_size, time.time() - timer  # Return success and relevant statistics
-
-            if current_state in visited:  # If the state has already been visited
-                continue  # Skip to the next state in the stack
-            visited.add(current_state)  # Add the current state to the visited set
-
-            for move in Puzzle.getValidMoves(current_state):  # For each valid move from the current state
-                new_state = list(current_state)  # Create a new list for the new state
-                Puzzle.makeMove(new_state, move)  # Make the move on the new state
-                new_state_tuple = tuple(new_state)  # Convert the new state to a tuple
-
-                if new_state_tuple not in visited:  # If the new state has not been visited
-                    # Push the new state onto the stack with its moves
-                    stack.append((new_state_tuple, moves_made + [move], depth + 1))
-
-        return False, 0, expanded_nodes, max_fringe_size, time.time() - timer  # Unable to find a solution
-    
-    # UCS
-    @staticmethod
-    def UCS(board, timeout=10):
-        """Attempt to solve the puzzle using Uniform-Cost Search."""
-        print('\n>>>Attempting to solve the puzzle using UCS...')
-        start_state = tuple(board)
-        goal_state = tuple(Puzzle.getNewBoard())
-
-        timer = time.time()
-        priority_queue = [(0, start_state, [], 0)]
-        visited = set()
-        expanded_nodes = 0
-        max_fringe_size = 0 
-
-        while priority_queue:  # While there are states to explore in the queue
-            # Check for timeout
-            if time.time() - timer > timeout:
-                print("Timeout")
-                return False, 0, expanded_nodes, max_fringe_size, time.time() - timer
-            
-            cost_so_far, current_state, moves_made, depth = heapq.heappop(priority_queue)  # Pop the state with the lowest cost
-            expanded_nodes += 1  # Increment the expanded nodes counter
-            max_fringe_size = max(max_fringe_size, len(priority_queue))  # Update max fringe size
-
-            if current_state == goal_state:  # If the current state is the goal state
-                # print the moves made
-                for move in moves_made:
-                    time.sleep(0.5)
-                    os.system('cls' if os.name == 'nt' else 'clear')
-                    Puzzle.makeMove(board, move)
-                    Puzzle.displayBoard(board)
-                    print()
-                print('Solved in', len(moves_made), 'moves:')  # Print the number of moves taken to solve
-                print(', '.join(moves_made))  # Print the moves made
-                return True, len(moves_made), expanded_nodes, max_fringe_size, time.time() - timer  # Return success and relevant statistics
-
-            if current_state in visited:  # If the state has already been visited
-                continue  # Skip to the next state in the queue
-            visited.add(current_state)  # Add the current state to the visited set
-
-            for move in Puzzle.getValidMoves(current_state):  # For each valid move from the current state
-                new_state = list(current_state)  # Create a new list for the new state
-                Puzzle.makeMove(new_state, move)  # Make the move on the new state
-                new_state_tuple = tuple(new_state)  # Convert the new state to a tuple
-                new_cost = cost_so_far + 1  # Increment the cost of the new state
-
-                if new_state_tuple not in visited:  # If the new state has not been visited
-                    # Push the new state into the priority queue with its total cost:
-                    heapq.heappush(priority_queue, (new_cost, new_state_tuple, moves_made + [move], depth + 1))
-
-        return False, 0, expanded_nodes, max_fringe_size, time.time() - timer  # Unable to find a solution
- 
-    # DFS - itterative deepening
-    def DFSR(board, maxMoves=10):
-        """Attempt to solve the puzzle in `board` in at most `maxMoves` moves."""
-        print('\n>>>Attempting to solve the puzzle using Recursive DFS in at most', maxMoves, 'moves...')
-        
-        timer = time.time()
-        moves_made = []
-        expanded_nodes = 0 
-        max_fringe_size = 0
-        solved = Search.backtrack(board, moves_made, maxMoves, None)
-        
-        if solved:
-            # print the moves made
-            for move in moves_made:
-                time.sleep(0.5)
-                os.system('cls' if os.name == 'nt' else 'clear')
-                Puzzle.makeMove(board, move)
-                Puzzle.displayBoard(board)
-                print()
-            print('Solved in', len(moves_made), 'moves:')  # Print the number of moves taken to solve
-            print(', '.join(moves_made))  # Print the moves made
-            return True, len(moves_made), expanded_nodes, max_fringe_size, time.time() - timer # Puzzle was solved.
-        else:
-            return False, len(moves_made), expanded_nodes, max_fringe_size, time.time() - timer # Unable to solve in maxMoves moves.
-    
-    # backtrack
-    def backtrack(board, movesMade, movesRemaining, prevMove):
-        """A recursive function that attempts all possible moves until 
-        it finds a solution or reaches the maxMoves limit."""
-        if movesRemaining < 0:
-            # BASE CASE - Ran out of moves.
-            return False
-        if board == Puzzle.SOLVED_BOARD:
-            # BASE CASE - Solved the puzzle.
-            return True
-        # RECURSIVE CASE - Attempt each of the valid moves:
-        for move in Puzzle.getValidMoves(board, prevMove):
-            # Make the move:
-            Puzzle.makeMove(board, move)
-            movesMade.append(move)
-            if Search.backtrack(board, movesMade, movesRemaining - 1, move):
-                # If the puzzle is solved, return True:
-                Puzzle.undoMove(board, move) # Reset to the original puzzle.
-                return True
-            # Undo the move to set up for the next move:
-            Puzzle.undoMove(board, move)
-            movesMade.pop() # Remove the last move since it was undone.
-        return False # BASE CASE - Unable to find a solution.
\ No newline at end of file
+from puzzle import Puzzle, PuzzleSpec, DEFAULT_SPEC, UP, DOWN, LEFT, RIGHT
+import sys
+import time 
+from collections import deque, namedtuple
+import heapq
+from openlist import makeOpenList
+from closedlist import makeClosedList, DictClosedList, ClosedListFull
+
+try:
+    import numpy as np  # Only needed by LayerBFS.
+except ImportError:
+    np = None
+
+TIMEOUT_CHECK_INTERVAL = 256  # Expansions between two looks at the clock.
+LAYER_CHUNK = 1 << 16  # States of a layer LayerBFS expands at once, between two looks at the clock.
+
+# What every search returns: the moves found and the statistics of the run.
+SearchResult = namedtuple('SearchResult', [
+    'solved',  # True if a solution was found.
+    'moves',  # The moves that solve the puzzle, empty if unsolved.
+    'depth',  # Number of moves in the solution.
+    'expanded_nodes',  # Number of states expanded.
+    'max_fringe_size',  # Largest number of states waiting to be expanded, sampled with the clock and at the end.
+    'wall_time',  # Seconds of real time spent searching.
+    'cpu_time',  # Seconds of CPU time spent searching.
+    'timed_out',  # True if the search stopped because of its timeout.
+    'unsolvable',  # True if the board was rejected because no moves can solve it.
+    'closed_bytes',  # Bytes held in memory by the closed list of A*, BFS, DFS or UCS, or by ARA*'s closed list and cost map, at the end of the search.
+    'memory_limited',  # True if the search failed or fell back to IDA* at the closed list's memory limit.
+    'suboptimality_bound',  # How many times longer than the shortest solution the moves can be, set by the bounded-suboptimal searches.
+], defaults=(0, False, None))
+
+class Search:
+    # Result of a search
+    @staticmethod
+    def makeResult(solved, moves, expandedNodes, maxFringeSize, timer, cpuTimer, timedOut=False, unsolvable=False,
+                   closedBytes=0, memoryLimited=False, suboptimalityBound=None):
+        """Build the SearchResult of a search started at perf_counter() `timer`
+        and process_time() `cpuTimer`."""
+        return SearchResult(solved, list(moves), len(moves), expandedNodes, maxFringeSize,
+                            time.perf_counter() - timer, time.process_time() - cpuTimer, timedOut, unsolvable,
+                            closedBytes, memoryLimited, suboptimalityBound)
+
+    @staticmethod
+    def costMapBytes(costs):
+        """Estimated bytes held by a dict of state -> path cost kept beside a
+        closed list: its table and a cost int per entry. The states are the
+        closed list's keys, already counted there."""
+        return sys.getsizeof(costs) + len(costs) * sys.getsizeof(0)
+
+    @staticmethod
+    def unsolvableResult():
+        """The result of a search given a board that cannot be solved."""
+        return Search.makeResult(False, [], 0, 0, time.perf_counter(), time.process_time(), unsolvable=True)
+
+    @staticmethod
+    def memoryLimitResult(board, heuristic, closed, onMemoryLimit, expandedNodes, maxFringeSize, timer, cpuTimer,
+                          timeout=None, spec=DEFAULT_SPEC):
+        """The result of a search whose closed list reached its memory limit:
+        a failure, or with onMemoryLimit 'reexpand' the result of IDA* with
+        the same heuristic, which keeps only the current path and so expands
+        states again instead of remembering them. The statistics include the
+        search done before the limit."""
+        closed_bytes = closed.nbytes()
+        if onMemoryLimit != 'reexpand':
+            return Search.makeResult(False, [], expandedNodes, maxFringeSize, timer, cpuTimer,
+                                     closedBytes=closed_bytes, memoryLimited=True)
+        closed.clear()  # Free the memory for the rest of the run.
+        remaining = None if timeout is None else timeout - (time.perf_counter() - timer)
+        if remaining is not None and remaining <= 0:
+            return Search.makeResult(False, [], expandedNodes, maxFringeSize, timer, cpuTimer, timedOut=True,
+                                     closedBytes=closed_bytes, memoryLimited=True)
+        result = Search.IDAstar(board, heuristic, remaining, spec)
+        return Search.makeResult(result.solved, result.moves, expandedNodes + result.expanded_nodes,
+                                 max(maxFringeSize, result.max_fringe_size), timer, cpuTimer, result.timed_out,
+                                 closedBytes=closed_bytes, memoryLimited=True)
+
+    @staticmethod
+    def suboptimalityBound(cost, lowerBound):
+        """How many times longer than the shortest solution a solution of
+        `cost` moves can be, given a lower bound on the shortest one."""
+        if cost <= lowerBound:
+            return 1.0
+        return cost / lowerBound if lowerBound > 0 else float('inf')
+
+    @staticmethod
+    def zeroHeuristic(board, spec=DEFAULT_SPEC):
+        """No estimate at all, for IDA* standing in for an uninformed search."""
+        return 0
+
+    @staticmethod
+    def zeroHeuristicDelta(board, h, tile, fromIndex, toIndex, spec=DEFAULT_SPEC):
+        return 0
+
+    # A* solution with a chosen heuristic
+    @staticmethod
+    def Astar(board, heuristic, timeout=None, spec=DEFAULT_SPEC, openList='bucket', closedList='dict',
+              memoryLimit=None, onMemoryLimit='fail', profiler=None):
+        """Use A* to solve the puzzle with the specified heuristic. Without a
+        timeout it runs until the queue is exhausted. openList names the
+        priority queue (see openlist.OPEN_LISTS); the bucket queue falls back
+        to the heap for heuristics with non-integer values. closedList names
+        the closed list ('dict' or 'compact'), which may hold at most
+        memoryLimit bytes; onMemoryLimit says what happens at the limit
+        ('fail', 'spill' or 'reexpand', see closedlist.py). A profiler (see
+        instrument.py) records the run."""
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, spec)  # Accept packed boards too.
+        if not Puzzle.isSolvable(board, spec):
+            return Search.unsolvableResult()  # Reject boards no moves can solve before searching.
+        start_state = Puzzle.packBoard(board, spec)
+        start_blank = Puzzle.findBlankIndex(board, spec)
+        goal_state = spec.goalState
+
+        # Initialize a priority queue of (cost + heuristic, cost so far, (board state, blank index, heuristic, parent state, move))
+        timer = time.perf_counter()
+        cpu_timer = time.process_time()
+        if profiler is not None:
+            heuristic = profiler.timeHeuristic(heuristic)  # Count and time every evaluation.
+        delta = Puzzle.getHeuristicDelta(heuristic)  # Incremental heuristic, if there is one.
+        start_heuristic = heuristic(board, spec)
+        priority_queue = makeOpenList(openList, start_heuristic, Puzzle.isIntegral(heuristic))
+        push, pop = priority_queue.push, priority_queue.pop
+        parents = makeClosedList(closedList, spec, memoryLimit, onMemoryLimit)  # Closed states, mapped to (parent state, move from the parent).
+        if profiler is not None:
+            push = profiler.countGenerated(push)
+            parents = profiler.watchClosedList(parents)
+        push(0 + start_heuristic, 0, (start_state, start_blank, start_heuristic, None, None))
+        expanded_nodes = 0
+        max_fringe_size = 0
+
+        try:
+            while priority_queue:  # While there are states to explore in the queue.
+                if not expanded_nodes % TIMEOUT_CHECK_INTERVAL:  # Every so often, sample the fringe and check for timeout.
+                    max_fringe_size = max(max_fringe_size, len(priority_queue))
+                    if profiler is not None:
+                        profiler.sample(expanded_nodes, len(priority_queue), len(parents))
+                    if timeout is not None and time.perf_counter() - timer > timeout:
+                        return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer, timedOut=True,
+                                                 closedBytes=parents.nbytes())
+
+                estimated_cost, cost_so_far, (current_state, blank, current_heuristic, parent, last_move) = pop()  # Pop the state with the lowest cost.
+                expanded_nodes += 1  # Increment the expanded nodes counter.
+
+                if current_state in parents:  # If the state has already been visited.
+                    continue  # Skip to the next state in the queue.
+                parents[current_state] = (parent, last_move)  # Remember how the state was reached.
+
+                if current_state == goal_state:  # If the current state is the goal state.
+                    moves_made = Search.reconstructPath(parents, current_state)
+                    return Search.makeResult(True, moves_made, expanded_nodes, max(max_fringe_size, len(priority_queue)),
+                                             timer, cpu_timer, closedBytes=parents.nbytes())  # Return success and relevant statistics.
+
+                # For each valid move from the current state, get the packed new state and its blank index.
+                for move, new_state, new_blank, tile in Puzzle.getPackedSuccessors(current_state, blank, spec=spec):
+                    if new_state not in parents:  # If the new state has not been visited.
+                        new_cost = cost_so_far + 1  # Increment the cost of the new state.
+                        # Calculate the heuristic for the new state, from the parent's value when possible:
+                        if delta:
+                            heuristic_value = delta(new_state, current_heuristic, tile, new_blank, blank, spec)
+                        else:
+                            heuristic_value = heuristic(Puzzle.unpackBoard(new_state, spec), spec)
+                        # Push the new state into the priority queue with its total cost:
+                        push(new_cost + heuristic_value, new_cost, (new_state, new_blank, heuristic_value, current_state, move))
+        except ClosedListFull:
+            priority_queue = push = pop = None  # Free the fringe too before going on.
+            return Search.memoryLimitResult(board, heuristic, parents, onMemoryLimit, expanded_nodes, max_fringe_size,
+                                            timer, cpu_timer, timeout, spec)
+
+        return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer,
+                                 closedBytes=parents.nbytes())  # Unable to find a solution.
+    
+    # BFS
+    @staticmethod
+    def BFS(board, timeout=10, spec=DEFAULT_SPEC, closedList='dict', memoryLimit=None, onMemoryLimit='fail',
+            profiler=None):
+        """Attempt to solve the puzzle using Breadth-First Search. closedList,
+        memoryLimit and onMemoryLimit set up the closed list, and profiler
+        records the run, as for Astar; 'reexpand' goes on with iterative
+        deepening."""
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, spec)  # Accept packed boards too.
+        if not Puzzle.isSolvable(board, spec):
+            return Search.unsolvableResult()  # Reject boards no moves can solve before searching.
+        start_state = Puzzle.packBoard(board, spec)
+        start_blank = Puzzle.findBlankIndex(board, spec)
+        goal_state = spec.goalState
+
+        # Initialize a queue with (board state, blank index, depth).
+        timer = time.perf_counter()
+        cpu_timer = time.process_time()
+        queue = deque([(start_state, start_blank, 0)])  
+        enqueue = queue.append
+        parents = makeClosedList(closedList, spec, memoryLimit, onMemoryLimit)  # Seen states, mapped to (parent state, move from the parent).
+        if profiler is not None:
+            enqueue = profiler.countGenerated(enqueue)
+            parents = profiler.watchClosedList(parents)
+        expanded_nodes = 0
+        max_fringe_size = 0
+
+        try:
+            parents[start_state] = (None, None)
+            while queue:  # While there are states to explore in the queue.
+                if not expanded_nodes % TIMEOUT_CHECK_INTERVAL:  # Every so often, sample the fringe and check for timeout.
+                    max_fringe_size = max(max_fringe_size, len(queue))
+                    if profiler is not None:
+                        profiler.sample(expanded_nodes, len(queue), len(parents))
+                    if time.perf_counter() - timer > timeout:
+                        return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer, timedOut=True,
+                                                 closedBytes=parents.nbytes())
+            
+                current_state, blank, depth = queue.popleft()  # Dequeue the state.
+                expanded_nodes += 1  # Increment the expanded nodes counter.
+
+                if current_state == goal_state:  # If the current state is the goal state.
+                    moves_made = Search.reconstructPath(parents, current_state)
+                    return Search.makeResult(True, moves_made, expanded_nodes, max(max_fringe_size, len(queue)), timer,
+                                             cpu_timer, closedBytes=parents.nbytes())  # Return success and relevant statistics.
+
+                # For each valid move from the current state, get the packed new state and its blank index.
+                for move, new_state, new_blank, tile in Puzzle.getPackedSuccessors(current_state, blank, spec=spec):
+                    if new_state not in parents:  # If the new state has not been seen.
+                        parents[new_state] = (current_state, move)  # Remember how the state was reached.
+                        # Enqueue the new state and increment depth:
+                        enqueue((new_state, new_blank, depth + 1))
+        except ClosedListFull:
+            queue = None  # Free the fringe too before going on.
+            return Search.memoryLimitResult(board, Search.zeroHeuristic, parents, onMemoryLimit, expanded_nodes,
+                                            max_fringe_size, timer, cpu_timer, timeout, spec)
+
+        return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer,
+                                 closedBytes=parents.nbytes())  # Unable to find a solution.
+    
+    # DFS - normal
+    @staticmethod
+    def DFS(board, timeout=10, spec=DEFAULT_SPEC, closedList='dict', memoryLimit=None, onMemoryLimit='fail',
+            profiler=None):
+        """Attempt to solve the puzzle using Depth-First Search. closedList,
+        memoryLimit and onMemoryLimit set up the closed list, and profiler
+        records the run, as for Astar; 'reexpand' goes on with iterative
+        deepening."""
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, spec)  # Accept packed boards too.
+        if not Puzzle.isSolvable(board, spec):
+            return Search.unsolvableResult()  # Reject boards no moves can solve before searching.
+        start_state = Puzzle.packBoard(board, spec)
+        start_blank = Puzzle.findBlankIndex(board, spec)
+        goal_state = spec.goalState
+
+        timer = time.perf_counter()
+        cpu_timer = time.process_time()
+        stack = [(start_state, start_blank, None, None, 0)]  # (board state, blank index, parent state, move, depth)
+        push = stack.append
+        parents = makeClosedList(closedList, spec, memoryLimit, onMemoryLimit)  # Closed states, mapped to (parent state, move from the parent).
+        if profiler is not None:
+            push = profiler.countGenerated(push)
+            parents = profiler.watchClosedList(parents)
+        expanded_nodes = 0
+        max_fringe_size = 0
+
+        try:
+            while stack:  # While there are states to explore in the stack
+                if not expanded_nodes % TIMEOUT_CHECK_INTERVAL:  # Every so often, sample the fringe and check for timeout
+                    max_fringe_size = max(max_fringe_size, len(stack))
+                    if profiler is not None:
+                        profiler.sample(expanded_nodes, len(stack), len(parents))
+                    if time.perf_counter() - timer > timeout:
+                        return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer, timedOut=True,
+                                                 closedBytes=parents.nbytes())
+            
+                current_state, blank, parent, last_move, depth = stack.pop()  # Pop the last state from the stack
+                expanded_nodes += 1  # Increment the expanded nodes counter
+
+                if current_state in parents:  # If the state has already been visited
+                    continue  # Skip to the next state in the stack
+                parents[current_state] = (parent, last_move)  # Remember how the state was reached
+
+                if current_state == goal_state:  # If the current state is the goal state
+                    moves_made = Search.reconstructPath(parents, current_state)
+                    return Search.makeResult(True, moves_made, expanded_nodes, max(max_fringe_size, len(stack)), timer,
+                                             cpu_timer, closedBytes=parents.nbytes())  # Return success and relevant statistics
+
+                # For each valid move from the current state, get the packed new state and its blank index
+                for move, new_state, new_blank, tile in Puzzle.getPackedSuccessors(current_state, blank, spec=spec):
+                    if new_state not in parents:  # If the new state has not been visited
+                        # Push the new state onto the stack with the move that reached it
+                        push((new_state, new_blank, current_state, move, depth + 1))
+        except ClosedListFull:
+            stack = None  # Free the fringe too before going on.
+            return Search.memoryLimitResult(board, Search.zeroHeuristic, parents, onMemoryLimit, expanded_nodes,
+                                            max_fringe_size, timer, cpu_timer, timeout, spec)
+
+        return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer,
+                                 closedBytes=parents.nbytes())  # Unable to find a solution
+    
+    # UCS
+    @staticmethod
+    def UCS(board, timeout=10, spec=DEFAULT_SPEC, openList='bucket', closedList='dict', memoryLimit=None,
+            onMemoryLimit='fail', profiler=None):
+        """Attempt to solve the puzzle using Uniform-Cost Search. openList,
+        closedList, memoryLimit and onMemoryLimit set up the priority queue
+        and the closed list, and profiler records the run, as for Astar;
+        'reexpand' goes on with iterative deepening."""
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, spec)  # Accept packed boards too.
+        if not Puzzle.isSolvable(board, spec):
+            return Search.unsolvableResult()  # Reject boards no moves can solve before searching.
+        start_state = Puzzle.packBoard(board, spec)
+        start_blank = Puzzle.findBlankIndex(board, spec)
+        goal_state = spec.goalState
+
+        timer = time.perf_counter()
+        cpu_timer = time.process_time()
+        priority_queue = makeOpenList(openList)  # (cost so far, depth, (board state, blank index, parent state, move))
+        push, pop = priority_queue.push, priority_queue.pop
+        parents = makeClosedList(closedList, spec, memoryLimit, onMemoryLimit)  # Closed states, mapped to (parent state, move from the parent).
+        if profiler is not None:
+            push = profiler.countGenerated(push)
+            parents = profiler.watchClosedList(parents)
+        push(0, 0, (start_state, start_blank, None, None))
+        expanded_nodes = 0
+        max_fringe_size = 0 
+
+        try:
+            while priority_queue:  # While there are states to explore in the queue
+                if not expanded_nodes % TIMEOUT_CHECK_INTERVAL:  # Every so often, sample the fringe and check for timeout
+                    max_fringe_size = max(max_fringe_size, len(priority_queue))
+                    if profiler is not None:
+                        profiler.sample(expanded_nodes, len(priority_queue), len(parents))
+                    if time.perf_counter() - timer > timeout:
+                        return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer, timedOut=True,
+                                                 closedBytes=parents.nbytes())
+            
+                cost_so_far, depth, (current_state, blank, parent, last_move) = pop()  # Pop the state with the lowest cost
+                expanded_nodes += 1  # Increment the expanded nodes counter
+
+                if current_state in parents:  # If the state has already been visited
+                    continue  # Skip to the next state in the queue
+                parents[current_state] = (parent, last_move)  # Remember how the state was reached
+
+                if current_state == goal_state:  # If the current state is the goal state
+                    moves_made = Search.reconstructPath(parents, current_state)
+                    return Search.makeResult(True, moves_made, expanded_nodes, max(max_fringe_size, len(priority_queue)),
+                                             timer, cpu_timer, closedBytes=parents.nbytes())  # Return success and relevant statistics
+
+                # For each valid move from the current state, get the packed new state and its blank index
+                for move, new_state, new_blank, tile in Puzzle.getPackedSuccessors(current_state, blank, spec=spec):
+                    if new_state not in parents:  # If the new state has not been visited
+                        new_cost = cost_so_far + 1  # Increment the cost of the new state
+                        # Push the new state into the priority queue with its total cost:
+                        push(new_cost, depth + 1, (new_state, new_blank, current_state, move))
+        except ClosedListFull:
+            priority_queue = push = pop = None  # Free the fringe too before going on.
+            return Search.memoryLimitResult(board, Search.zeroHeuristic, parents, onMemoryLimit, expanded_nodes,
+                                            max_fringe_size, timer, cpu_timer, timeout, spec)
+
+        return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer,
+                                 closedBytes=parents.nbytes())  # Unable to find a solution
+ 
+    # Bidirectional BFS
+    @staticmethod
+    def BidirectionalBFS(board, timeout=10, spec=DEFAULT_SPEC, profiler=None):
+        """Attempt to solve the puzzle using Breadth-First Search from both the
+        start and the solved board, meeting in the middle. A profiler
+        records the run, sampled once per layer."""
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, spec)  # Accept packed boards too.
+        if not Puzzle.isSolvable(board, spec):
+            return Search.unsolvableResult()  # Reject boards no moves can solve before searching.
+        goal = Puzzle.getNewBoard(spec)
+        start_state = Puzzle.packBoard(board, spec)
+        goal_state = spec.goalState
+
+        timer = time.perf_counter()
+        cpu_timer = time.process_time()
+        # Each side keeps its seen states, mapped to (parent state, move from the parent), and its last layer.
+        forward = {start_state: (None, None)}
+        backward = {goal_state: (None, None)}
+        forward_layer = [(start_state, Puzzle.findBlankIndex(board, spec))]
+        backward_layer = [(goal_state, Puzzle.findBlankIndex(goal, spec))]
+        expanded_nodes = 0
+        max_fringe_size = 0
+        meeting_state = start_state if start_state == goal_state else None
+
+        while meeting_state is None and forward_layer and backward_layer:  # While both sides can grow.
+            # Check for timeout
+            if time.perf_counter() - timer > timeout:
+                return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer, timedOut=True)
+
+            max_fringe_size = max(max_fringe_size, len(forward_layer) + len(backward_layer))  # Update max fringe size.
+            if profiler is not None:
+                profiler.sample(expanded_nodes, len(forward_layer) + len(backward_layer), len(forward) + len(backward))
+            # Grow the side with the smaller layer by one full layer.
+            if len(forward_layer) <= len(backward_layer):
+                layer, parents, other = forward_layer, forward, backward
+            else:
+                layer, parents, other = backward_layer, backward, forward
+            if profiler is not None:
+                parents = profiler.watchClosedList(parents)  # Count the states this side has already seen.
+            next_layer = []
+            best_length = None
+            for current_state, blank in layer:
+                # Layers grow large, so check for timeout within them too:
+                if not expanded_nodes % TIMEOUT_CHECK_INTERVAL and time.perf_counter() - timer > timeout:
+                    return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer, timedOut=True)
+                expanded_nodes += 1  # Increment the expanded nodes counter.
+                for move, new_state, new_blank, tile in Puzzle.getPackedSuccessors(current_state, blank, spec=spec):
+                    if new_state in parents:  # If this side has already seen the state.
+                        continue
+                    parents[new_state] = (current_state, move)  # Remember how the state was reached.
+                    next_layer.append((new_state, new_blank))
+                    if new_state in other:  # The two searches meet.
+                        # Keep the shortest meeting of the layer:
+                        length = len(Search.reconstructPath(forward, new_state)) + len(Search.reconstructPath(backward, new_state))
+                        if best_length is None or length < best_length:
+                            best_length, meeting_state = length, new_state
+            if profiler is not None:
+                profiler.generated += len(next_layer)
+            if layer is forward_layer:
+                forward_layer = next_layer
+            else:
+                backward_layer = next_layer
+
+        if meeting_state is None:
+            return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer)  # Unable to find a solution.
+
+        moves_made = Search.splicePath(forward, backward, meeting_state)
+        return Search.makeResult(True, moves_made, expanded_nodes, max_fringe_size, timer, cpu_timer)  # Return success and relevant statistics.
+
+    # Bidirectional A*
+    @staticmethod
+    def BidirectionalAstar(board, heuristic, timeout=None, spec=DEFAULT_SPEC, profiler=None):
+        """Use front-to-end bidirectional A* to solve the puzzle. Both searches
+        use the specified heuristic, the backward one with the start board as
+        its goal; a heuristic tied to one goal (one carrying its own spec, such
+        as a pattern database) is replaced by Manhattan distance backwards. The
+        search stops once the best meeting found costs no more than the
+        smallest f on either open list, so the solution is optimal for
+        admissible heuristics. A profiler records the run."""
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, spec)  # Accept packed boards too.
+        if not Puzzle.isSolvable(board, spec):
+            return Search.unsolvableResult()  # Reject boards no moves can solve before searching.
+        goal = Puzzle.getNewBoard(spec)
+        start_state = Puzzle.packBoard(board, spec)
+        goal_state = spec.goalState
+
+        # The backward search heads for the start board, so its heuristic measures against that.
+        start_spec = PuzzleSpec(spec.size, board, spec.difficulty)
+        backward_heuristic = Puzzle.manhattanDistance if getattr(heuristic, 'spec', None) else heuristic
+        push = heapq.heappush
+        if profiler is not None:
+            heuristic = profiler.timeHeuristic(heuristic)  # Count and time every evaluation.
+            backward_heuristic = profiler.timeHeuristic(backward_heuristic)
+            push = profiler.countGenerated(push)
+
+        forward_delta = Puzzle.getHeuristicDelta(heuristic)
+        backward_delta = Puzzle.getHeuristicDelta(backward_heuristic)
+        timer = time.perf_counter()
+        cpu_timer = time.process_time()
+        # Each side has a priority queue of (cost + heuristic, cost so far, board state, blank index, heuristic),
+        # the best cost found for each state mapped to (cost, parent state, move), and a closed set.
+        forward_heuristic = heuristic(board, spec)
+        backward_start_heuristic = backward_heuristic(goal, start_spec)
+        forward_queue = [(forward_heuristic, 0, start_state, Puzzle.findBlankIndex(board, spec), forward_heuristic)]
+        backward_queue = [(backward_start_heuristic, 0, goal_state, Puzzle.findBlankIndex(goal, spec), backward_start_heuristic)]
+        forward = {start_state: (0, None, None)}
+        backward = {goal_state: (0, None, None)}
+        forward_closed = set()
+        backward_closed = set()
+        forward_costs, backward_costs = forward, backward  # The maps a side looks its own states up in.
+        if profiler is not None:
+            forward_closed = profiler.watchClosedList(forward_closed)
+            backward_closed = profiler.watchClosedList(backward_closed)
+            forward_costs = profiler.watchClosedList(forward)
+            backward_costs = profiler.watchClosedList(backward)
+        expanded_nodes = 0
+        max_fringe_size = 0
+        best_cost = 0 if start_state == goal_state else float('inf')  # Cost of the best meeting found so far.
+        meeting_state = start_state if start_state == goal_state else None
+
+        while True:
+            if not expanded_nodes % TIMEOUT_CHECK_INTERVAL:  # Every so often, sample the fringe and check for timeout.
+                max_fringe_size = max(max_fringe_size, len(forward_queue) + len(backward_queue))
+                if profiler is not None:
+                    profiler.sample(expanded_nodes, len(forward_queue) + len(backward_queue),
+                                    len(forward_closed) + len(backward_closed))
+                if timeout is not None and time.perf_counter() - timer > timeout:
+                    return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer, timedOut=True)
+
+            # Stop when no open state can lead to a cheaper meeting.
+            forward_bound = forward_queue[0][0] if forward_queue else float('inf')
+            backward_bound = backward_queue[0][0] if backward_queue else float('inf')
+            if best_cost <= max(forward_bound, backward_bound):
+                max_fringe_size = max(max_fringe_size, len(forward_queue) + len(backward_queue))
+                break
+
+            # Expand from the side with the smaller open list; each side measures against its own goal.
+            if len(forward_queue) <= len(backward_queue):
+                queue, costs, closed, other, delta, evaluate, side_spec = forward_queue, forward_costs, forward_closed, backward, forward_delta, heuristic, spec
+            else:
+                queue, costs, closed, other, delta, evaluate, side_spec = backward_queue, backward_costs, backward_closed, forward, backward_delta, backward_heuristic, start_spec
+            estimated_cost, cost_so_far, current_state, blank, current_heuristic = heapq.heappop(queue)
+            if current_state in closed or cost_so_far > costs[current_state][0]:
+                continue  # Skip states already expanded and outdated entries.
+            closed.add(current_state)
+            expanded_nodes += 1  # Increment the expanded nodes counter.
+
+            for move, new_state, new_blank, tile in Puzzle.getPackedSuccessors(current_state, blank, spec=spec):
+                new_cost = cost_so_far + 1  # Increment the cost of the new state.
+                if new_state in costs and costs[new_state][0] <= new_cost:
+                    continue  # Already reached at least as cheaply.
+                costs[new_state] = (new_cost, current_state, move)
+                if new_state in other and new_cost + other[new_state][0] < best_cost:  # A cheaper meeting.
+                    best_cost = new_cost + other[new_state][0]
+                    meeting_state = new_state
+                # Calculate the heuristic for the new state, from the parent's value when possible:
+                if delta:
+                    heuristic_value = delta(new_state, current_heuristic, tile, new_blank, blank, side_spec)
+                else:
+                    heuristic_value = evaluate(Puzzle.unpackBoard(new_state, spec), side_spec)
+                push(queue, (new_cost + heuristic_value, new_cost, new_state, new_blank, heuristic_value))
+
+        if meeting_state is None:
+            return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer)  # Unable to find a solution.
+
+        # Drop the costs so the parent links have the (parent state, move) shape.
+        forward = {state: (parent, move) for state, (cost, parent, move) in forward.items()}
+        backward = {state: (parent, move) for state, (cost, parent, move) in backward.items()}
+        moves_made = Search.splicePath(forward, backward, meeting_state)
+        return Search.makeResult(True, moves_made, expanded_nodes, max_fringe_size, timer, cpu_timer)  # Return success and relevant statistics.
+
+    # Layer-synchronous BFS over NumPy arrays
+    @staticmethod
+    def LayerBFS(board, timeout=10, spec=DEFAULT_SPEC, profiler=None):
+        """Attempt to solve the puzzle using Breadth-First Search one whole
+        depth layer at a time. A layer is a sorted NumPy array of packed
+        states: every child is generated at once with vectorized move tables,
+        and duplicates are removed with np.unique and a searchsorted lookup in
+        the layer before. Every slide moves the blank to a cell of the other
+        colour of a chessboard, so a child is never in its own layer and
+        the two latest layers are all that must be kept. Each layer also keeps
+        the index of every state's parent and the move that reached it, to
+        rebuild the path. Without NumPy, or for boards that do not pack into
+        64 bits, this runs Search.BFS instead. A profiler records the run,
+        sampled once per layer."""
+        if np is None or spec.cells * spec.tileBits > 64:
+            return Search.BFS(board, timeout, spec, profiler=profiler)
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, spec)  # Accept packed boards too.
+        if not Puzzle.isSolvable(board, spec):
+            return Search.unsolvableResult()  # Reject boards no moves can solve before searching.
+        goal_state = np.uint64(spec.goalState)
+
+        # tile_cells[code][blank] is the cell of the tile that slides into the blank with moves[code], or -1.
+        moves = (UP, LEFT, DOWN, RIGHT)
+        tile_cells = np.full((len(moves), spec.cells), -1, dtype=np.intp)
+        for blank in range(spec.cells):
+            for move in spec.validMoves[blank][None]:
+                tile_cells[moves.index(move), blank] = blank + spec.moveOffsets[move]
+        tile_bits = np.uint64(spec.tileBits)
+        tile_mask = np.uint64(spec.tileMask)
+
+        timer = time.perf_counter()
+        cpu_timer = time.process_time()
+        states = np.array([Puzzle.packBoard(board, spec)], dtype=np.uint64)  # The current layer, sorted.
+        blanks = np.array([Puzzle.findBlankIndex(board, spec)], dtype=np.intp)  # The blank cell of each state.
+        previous = np.empty(0, dtype=np.uint64)  # The layer before, sorted.
+        parents = [None]  # parents[depth][i] = index in the layer above of the parent of state i.
+        move_codes = [None]  # move_codes[depth][i] = index in `moves` of the move that reached state i.
+        expanded_nodes = 0
+        max_fringe_size = 1
+        dedupe_rate = 0.0  # Seconds per child the last layer took to deduplicate.
+
+        while len(states):  # While the last layer found new states.
+            found = np.searchsorted(states, goal_state)
+            if found < len(states) and states[found] == goal_state:  # If the goal is in this layer.
+                moves_made = []
+                for depth in range(len(parents) - 1, 0, -1):  # Walk the parent columns back to the start.
+                    moves_made.append(moves[move_codes[depth][found]])
+                    found = parents[depth][found]
+                moves_made.reverse()
+                return Search.makeResult(True, moves_made, expanded_nodes, max_fringe_size, timer, cpu_timer)  # Return success and relevant statistics.
+
+            # Generate the children of every state of the layer, LAYER_CHUNK states and one move direction at a time.
+            child_states, child_blanks, child_parents, child_moves = [], [], [], []
+            for start in range(0, len(states), LAYER_CHUNK):
+                # Check for timeout
+                if time.perf_counter() - timer > timeout:
+                    return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer, timedOut=True)
+                chunk_states = states[start:start + LAYER_CHUNK]
+                chunk_blanks = blanks[start:start + LAYER_CHUNK]
+                expanded_nodes += len(chunk_states)  # The whole chunk is expanded at once.
+                for code in range(len(moves)):
+                    cells = tile_cells[code][chunk_blanks]
+                    movable = np.flatnonzero(cells >= 0)  # The states of the chunk that can make this move.
+                    cells = cells[movable]
+                    parent_states = chunk_states[movable]
+                    tile_shifts = cells.astype(np.uint64) * tile_bits
+                    tiles = (parent_states >> tile_shifts) & tile_mask  # The tiles that slide into the blank.
+                    # The blank is 0, so XOR clears each tile from its cell and sets it in the blank's:
+                    child_states.append(parent_states ^ (tiles << tile_shifts) ^ (tiles << (chunk_blanks[movable].astype(np.uint64) * tile_bits)))
+                    child_blanks.append(cells)
+                    child_parents.append(movable + start)
+                    child_moves.append(np.full(len(movable), code, dtype=np.int8))
+
+            # Keep the first copy of each child, sorted, and drop those seen in the layer before. That sorts the
+            # whole next layer in one go, so give up now if, at the last layer's pace, it would end past the deadline.
+            child_states = np.concatenate(child_states)
+            dedupe_start = time.perf_counter()
+            if dedupe_start + dedupe_rate * len(child_states) - timer > timeout:
+                return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer, timedOut=True)
+            children, first = np.unique(child_states, return_index=True)
+            new = ~Search.sortedContains(previous, children)
+            first = first[new]
+            previous, states = states, children[new]
+            blanks = np.concatenate(child_blanks)[first]
+            parents.append(np.concatenate(child_parents)[first].astype(np.int32))
+            move_codes.append(np.concatenate(child_moves)[first])
+            dedupe_rate = (time.perf_counter() - dedupe_start) / len(child_states)
+            max_fringe_size = max(max_fringe_size, len(states))  # Update max fringe size.
+            if profiler is not None:
+                profiler.generated += len(states)
+                profiler.duplicates += len(child_states) - len(states)
+                profiler.sample(expanded_nodes, len(states), len(previous) + len(states))
+
+        return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer)  # Unable to find a solution.
+
+    @staticmethod
+    def sortedContains(sortedStates, states):
+        """Return a NumPy array of booleans telling which of `states` are in
+        the sorted array sortedStates, by binary search."""
+        if not len(sortedStates):
+            return np.zeros(len(states), dtype=bool)
+        index = np.searchsorted(sortedStates, states)
+        index[index == len(sortedStates)] = 0  # Past the end: any other element tells it is missing.
+        return sortedStates[index] == states
+
+    # Search chosen by name
+    @staticmethod
+    def solve(board, algorithm='astar', heuristic=None, timeout=None, spec=DEFAULT_SPEC, profiler=None):
+        """Run the search called `algorithm` in ALGORITHMS on the board. Searches
+        that take a heuristic use Manhattan distance unless one is given, and
+        the timeout is only passed on when it is set. A profiler records the
+        run under the algorithm's name and the heuristic's."""
+        search, usesHeuristic = ALGORITHMS[algorithm]
+        options = {'spec': spec} if timeout is None else {'timeout': timeout, 'spec': spec}
+        args = (board, heuristic or Puzzle.manhattanDistance) if usesHeuristic else (board,)
+        if profiler is not None:
+            name = f'{algorithm}/{args[1].__name__}' if usesHeuristic else algorithm
+            return profiler.run(name, search, *args, **options)
+        return search(*args, **options)
+
+    # Path reconstruction
+    @staticmethod
+    def reconstructPath(parents, state):
+        """Follow the parent links from `state` back to the start state and
+        return the moves that lead from the start to `state`."""
+        moves = []
+        parent, move = parents[state]
+        while move is not None:  # The start state has no move.
+            moves.append(move)
+            parent, move = parents[parent]
+        moves.reverse()
+        return moves
+
+    @staticmethod
+    def splicePath(forward, backward, state):
+        """Join a forward search from the start and a backward search from the
+        solved board that both reached `state`: the backward half is replayed
+        in reverse with every move inverted."""
+        moves = Search.reconstructPath(forward, state)
+        for move in reversed(Search.reconstructPath(backward, state)):
+            moves.append(Puzzle.oppositeMove(move))
+        return moves
+
+    # DFS - itterative deepening
+    def DFSR(board, maxMoves=10, spec=DEFAULT_SPEC, timeout=None):
+        """Attempt to solve the puzzle in `board` in at most `maxMoves` moves.
+        Without a timeout it runs until every sequence of moves is tried."""
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, spec)  # Accept packed boards too.
+        if not Puzzle.isSolvable(board, spec):
+            return Search.unsolvableResult()  # Reject boards no moves can solve before searching.
+        
+        timer = time.perf_counter()
+        cpu_timer = time.process_time()
+        moves_made = []
+        stats = [0, 0]  # Expanded nodes, and the deepest path (the only fringe DFSR keeps).
+        deadline = None if timeout is None else timer + timeout
+        solved = Search.backtrack(board, moves_made, maxMoves, None, spec, deadline, stats)
+        
+        if solved:
+            return Search.makeResult(True, moves_made, stats[0], stats[1], timer, cpu_timer) # Puzzle was solved.
+        elif solved is None:
+            return Search.makeResult(False, [], stats[0], stats[1], timer, cpu_timer, timedOut=True) # Out of time.
+        else:
+            return Search.makeResult(False, [], stats[0], stats[1], timer, cpu_timer) # Unable to solve in maxMoves moves.
+    
+    # backtrack
+    def backtrack(board, movesMade, movesRemaining, prevMove, spec=DEFAULT_SPEC, deadline=None, stats=None):
+        """A recursive function that attempts all possible moves until 
+        it finds a solution or reaches the maxMoves limit. Returns None if it
+        passed the perf_counter() deadline. stats, if given, counts the
+        expanded nodes and the deepest path."""
+        if movesRemaining < 0:
+            # BASE CASE - Ran out of moves.
+            return False
+        if Puzzle.packBoard(board, spec) == spec.goalState:
+            # BASE CASE - Solved the puzzle.
+            return True
+        if stats is not None:
+            if deadline is not None and not stats[0] % TIMEOUT_CHECK_INTERVAL and time.perf_counter() > deadline:
+                # BASE CASE - Out of time.
+                return None
+            stats[0] += 1  # Increment the expanded nodes counter.
+            stats[1] = max(stats[1], len(movesMade))  # Update the deepest path.
+        # RECURSIVE CASE - Attempt each of the valid moves:
+        for move in Puzzle.getValidMoves(board, prevMove, spec):
+            # Make the move:
+            Puzzle.makeMove(board, move, spec)
+            movesMade.append(move)
+            solved = Search.backtrack(board, movesMade, movesRemaining - 1, move, spec, deadline, stats)
+            if solved:
+                # If the puzzle is solved, return True:
+                Puzzle.undoMove(board, move, spec) # Reset to the original puzzle.
+                return True
+            # Undo the move to set up for the next move:
+            Puzzle.undoMove(board, move, spec)
+            movesMade.pop() # Remove the last move since it was undone.
+            if solved is None:
+                return None  # Out of time, unwind the whole search.
+        return False # BASE CASE - Unable to find a solution.
+
+    # IDA* - iterative deepening A*
+    @staticmethod
+    def IDAstar(board, heuristic, timeout=None, spec=DEFAULT_SPEC, profiler=None):
+        """Use IDA* to solve the puzzle with the specified heuristic, keeping
+        only the current path in memory. A profiler records the run, sampled
+        once per iteration, with the deepest path as its open list."""
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, spec)  # Accept packed boards too.
+        if not Puzzle.isSolvable(board, spec):
+            return Search.unsolvableResult()  # Reject boards no moves can solve before searching.
+        goal = Puzzle.getNewBoard(spec)
+
+        timer = time.perf_counter()
+        cpu_timer = time.process_time()
+        current = list(board)  # The board the moves are made and undone on.
+        moves_made = []
+        stats = [0, 0, 0]  # Expanded nodes, the deepest path (the only fringe IDA* keeps) and generated states.
+        if profiler is not None:
+            heuristic = profiler.timeHeuristic(heuristic)  # Count and time every evaluation.
+            profiler.duplicates = None  # IDA* keeps no closed list, so it never notices a duplicate.
+        delta = Puzzle.getHeuristicDelta(heuristic)  # Incremental heuristic, if there is one.
+        start_heuristic = heuristic(current, spec)
+        threshold = start_heuristic  # The first f-bound is the estimate for the start state.
+        deadline = None if timeout is None else timer + timeout
+
+        while True:
+            result = Search.idaSearch(current, goal, 0, start_heuristic, threshold, None, moves_made, heuristic, delta, stats, deadline, spec)
+            if profiler is not None:
+                profiler.generated = stats[2]
+                profiler.sample(stats[0], stats[1], 0)
+            if result is None:
+                return Search.makeResult(False, [], stats[0], stats[1], timer, cpu_timer, timedOut=True)
+            if result is True:
+                return Search.makeResult(True, moves_made, stats[0], stats[1], timer, cpu_timer)  # Return success and relevant statistics
+            if result == float('inf'):
+                return Search.makeResult(False, [], stats[0], stats[1], timer, cpu_timer)  # No state exceeded the bound: unable to find a solution
+            threshold = result  # Retry with the smallest f that exceeded the bound.
+
+    # IDA* bounded search
+    @staticmethod
+    def idaSearch(board, goal, cost, h, threshold, prevMove, movesMade, heuristic, delta, stats, deadline=None, spec=DEFAULT_SPEC):
+        """A recursive function that searches below `board` up to the f-bound
+        `threshold`. Returns True if it solved the puzzle (leaving the moves in
+        movesMade), None if it passed the perf_counter() deadline, otherwise
+        the smallest f-value that exceeded the bound."""
+        estimated_cost = cost + h
+        if estimated_cost > threshold:
+            # BASE CASE - Over the bound, report how far over.
+            return estimated_cost
+        if board == goal:
+            # BASE CASE - Solved the puzzle.
+            return True
+        if deadline is not None and not stats[0] % TIMEOUT_CHECK_INTERVAL and time.perf_counter() > deadline:
+            # BASE CASE - Out of time.
+            return None
+        stats[0] += 1  # Increment the expanded nodes counter.
+        stats[1] = max(stats[1], len(movesMade))  # Update the deepest path.
+        minimum = float('inf')  # Smallest f-value seen over the bound.
+        blank = Puzzle.findBlankIndex(board, spec)
+        # RECURSIVE CASE - Attempt each of the valid moves:
+        for move in Puzzle.getValidMoves(board, prevMove, spec):
+            # Make the move:
+            Puzzle.makeMove(board, move, spec)
+            movesMade.append(move)
+            stats[2] += 1  # Count the generated state.
+            if delta:
+                new_blank = Puzzle.findBlankIndex(board, spec)
+                new_h = delta(board, h, board[blank], new_blank, blank, spec)  # The moved tile is now where the blank was.
+            else:
+                new_h = heuristic(board, spec)
+            result = Search.idaSearch(board, goal, cost + 1, new_h, threshold, move, movesMade, heuristic, delta, stats, deadline, spec)
+            # Undo the move to set up for the next move:
+            Puzzle.undoMove(board, move, spec)
+            if result is True:
+                return True  # Keep movesMade for the caller.
+            if result is None:
+                movesMade.pop()
+                return None  # Out of time, unwind the whole search.
+            movesMade.pop()  # Remove the last move since it was undone.
+            minimum = min(minimum, result)
+        return minimum
+
+    # Weighted A* - bounded-suboptimal
+    @staticmethod
+    def WeightedAstar(board, heuristic, timeout=None, spec=DEFAULT_SPEC, weight=1.5, profiler=None):
+        """Use Weighted A* to solve the puzzle: A* ordered by cost + weight *
+        heuristic, which heads for the goal and expands far fewer states. For
+        a consistent heuristic the solution is at most `weight` times longer
+        than the shortest one; suboptimality_bound is the bound actually
+        proven, often well under the weight. It is ARA* stopped after its
+        first search."""
+        return Search.ARAstar(board, heuristic, timeout, spec, weight, finalWeight=weight, profiler=profiler)
+
+    # ARA* - anytime repairing A*
+    @staticmethod
+    def ARAstar(board, heuristic, timeout=None, spec=DEFAULT_SPEC, weight=3.0, step=0.5, finalWeight=1.0,
+                profiler=None):
+        """Use Anytime Repairing A* to solve the puzzle: a Weighted A* search
+        with `weight` finds a first solution quickly, then the weight is
+        lowered by `step` at a time down to finalWeight, and each search
+        improves on the last solution, reusing the states it reached instead
+        of starting over. At the timeout the best solution so far is returned
+        (solved, though timed_out is set); with no timeout it runs until the
+        weight reaches finalWeight, and the solution is optimal at 1.
+        suboptimality_bound is how many times longer than the shortest
+        solution the returned one can be. A profiler records the run."""
+        if weight < 1 or finalWeight < 1:
+            raise ValueError('ARA* weights must be at least 1')
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, spec)  # Accept packed boards too.
+        if not Puzzle.isSolvable(board, spec):
+            return Search.unsolvableResult()  # Reject boards no moves can solve before searching.
+        start_state = Puzzle.packBoard(board, spec)
+        start_blank = Puzzle.findBlankIndex(board, spec)
+        goal_state = spec.goalState
+
+        timer = time.perf_counter()
+        cpu_timer = time.process_time()
+        push = heapq.heappush
+        if profiler is not None:
+            heuristic = profiler.timeHeuristic(heuristic)  # Count and time every evaluation.
+            push = profiler.countGenerated(push)
+        delta = Puzzle.getHeuristicDelta(heuristic)  # Incremental heuristic, if there is one.
+        start_heuristic = heuristic(board, spec)
+        costs = {start_state: 0}  # Cheapest known cost of every state reached.
+        parents = DictClosedList(spec)  # Every state reached, mapped to (parent state, move) of its cheapest known path.
+        parents[start_state] = (None, None)
+        # A heap of (cost + weight * heuristic, heuristic, cost, (board state, blank index)); entries whose cost is no
+        # longer the state's cheapest are skipped.
+        open_list = [(weight * start_heuristic, start_heuristic, 0, (start_state, start_blank))]
+        closed = set()  # States expanded by the current search.
+        if profiler is not None:
+            closed = profiler.watchClosedList(closed)
+        inconsistent = {}  # Expanded states reached again more cheaply: state -> (blank index, heuristic).
+        moves_made = None  # The best solution so far.
+        bound = float('inf')
+        expanded_nodes = 0
+        max_fringe_size = 0
+
+        while True:
+            # Expand states until none can lead to a solution cheaper than the goal's cost.
+            while open_list and open_list[0][0] < costs.get(goal_state, float('inf')):
+                if not expanded_nodes % TIMEOUT_CHECK_INTERVAL:  # Every so often, sample the fringe and check for timeout.
+                    max_fringe_size = max(max_fringe_size, len(open_list))
+                    if profiler is not None:
+                        profiler.sample(expanded_nodes, len(open_list), len(costs))
+                    if timeout is not None and time.perf_counter() - timer > timeout:
+                        return Search.makeResult(moves_made is not None, moves_made or [], expanded_nodes, max_fringe_size,
+                                                 timer, cpu_timer, timedOut=True,
+                                                 closedBytes=parents.nbytes() + Search.costMapBytes(costs),
+                                                 suboptimalityBound=None if moves_made is None else bound)
+
+                estimated_cost, current_heuristic, cost_so_far, (current_state, blank) = heapq.heappop(open_list)
+                expanded_nodes += 1  # Increment the expanded nodes counter.
+                if cost_so_far != costs[current_state] or current_state in closed:
+                    continue  # Reached more cheaply since, or already expanded.
+                closed.add(current_state)
+
+                new_cost = cost_so_far + 1
+                for move, new_state, new_blank, tile in Puzzle.getPackedSuccessors(current_state, blank, spec=spec):
+                    if new_cost < costs.get(new_state, float('inf')):  # A cheaper path to the new state.
+                        costs[new_state] = new_cost
+                        parents[new_state] = (current_state, move)
+                        if delta:
+                            heuristic_value = delta(new_state, current_heuristic, tile, new_blank, blank, spec)
+                        else:
+                            heuristic_value = heuristic(Puzzle.unpackBoard(new_state, spec), spec)
+                        if new_state in closed:
+                            inconsistent[new_state] = (new_blank, heuristic_value)  # Expanded again by the next search.
+                        else:
+                            push(open_list, (new_cost + weight * heuristic_value, heuristic_value, new_cost,
+                                             (new_state, new_blank)))
+
+            max_fringe_size = max(max_fringe_size, len(open_list))
+            if goal_state not in costs:
+                return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer,
+                                         closedBytes=parents.nbytes() + Search.costMapBytes(costs))  # Unable to find a solution.
+            moves_made = Search.reconstructPath(parents, goal_state)
+            # The shortest solution passes through a state still to expand, or one expanded on a dearer path.
+            lower_bound = min([cost + h for f, h, cost, (state, blank) in open_list
+                               if cost == costs[state] and state not in closed]
+                              + [costs[state] + h for state, (blank, h) in inconsistent.items()],
+                              default=costs[goal_state])
+            bound = min(weight, Search.suboptimalityBound(costs[goal_state], max(lower_bound, start_heuristic)))
+            if bound <= 1 or weight <= finalWeight:
+                return Search.makeResult(True, moves_made, expanded_nodes, max_fringe_size, timer, cpu_timer,
+                                         closedBytes=parents.nbytes() + Search.costMapBytes(costs), suboptimalityBound=bound)
+
+            # Lower the weight, put the inconsistent states back in the open list and reorder it.
+            weight = max(finalWeight, min(weight - step, bound))
+            open_list = [(cost + weight * h, h, cost, node) for f, h, cost, node in open_list
+                         if cost == costs[node[0]] and node[0] not in closed]
+            open_list += [(costs[state] + weight * h, h, costs[state], (state, blank))
+                          for state, (blank, h) in inconsistent.items()]
+            heapq.heapify(open_list)
+            closed = set()
+            if profiler is not None:
+                closed = profiler.watchClosedList(closed)
+            inconsistent = {}
+
+    # Beam search
+    @staticmethod
+    def BeamSearch(board, heuristic, timeout=None, spec=DEFAULT_SPEC, width=500, profiler=None):
+        """Use beam search to solve the puzzle: a breadth-first search that
+        keeps only the `width` states of each layer with the lowest heuristic.
+        Time and memory per layer are bounded by the width, but the search can
+        prune away every solution and fail. With no other lower bound on the
+        shortest solution, suboptimality_bound compares the solution to the
+        start state's heuristic. A profiler records the run."""
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, spec)  # Accept packed boards too.
+        if not Puzzle.isSolvable(board, spec):
+            return Search.unsolvableResult()  # Reject boards no moves can solve before searching.
+        start_state = Puzzle.packBoard(board, spec)
+        goal_state = spec.goalState
+
+        timer = time.perf_counter()
+        cpu_timer = time.process_time()
+        if profiler is not None:
+            heuristic = profiler.timeHeuristic(heuristic)  # Count and time every evaluation.
+        delta = Puzzle.getHeuristicDelta(heuristic)  # Incremental heuristic, if there is one.
+        start_heuristic = heuristic(board, spec)
+        beam = [(start_state, Puzzle.findBlankIndex(board, spec), start_heuristic)]  # (board state, blank index, heuristic)
+        parents = DictClosedList(spec)  # States kept in a beam, mapped to (parent state, move from the parent).
+        if profiler is not None:
+            parents = profiler.watchClosedList(parents)
+        parents[start_state] = (None, None)
+        expanded_nodes = 0
+        max_fringe_size = 1
+
+        while beam:  # While the last layer kept any states.
+            layer = {}  # The next layer: state -> (heuristic, blank index, parent state, move).
+            for current_state, blank, current_heuristic in beam:
+                if not expanded_nodes % TIMEOUT_CHECK_INTERVAL:  # Every so often, sample the beam and check for timeout.
+                    if profiler is not None:
+                        profiler.sample(expanded_nodes, len(beam) + len(layer), len(parents))
+                    if timeout is not None and time.perf_counter() - timer > timeout:
+                        return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer, timedOut=True,
+                                                 closedBytes=parents.nbytes())
+
+                if current_state == goal_state:  # If the current state is the goal state.
+                    moves_made = Search.reconstructPath(parents, current_state)
+                    return Search.makeResult(True, moves_made, expanded_nodes, max_fringe_size, timer, cpu_timer,
+                                             closedBytes=parents.nbytes(),
+                                             suboptimalityBound=Search.suboptimalityBound(len(moves_made), start_heuristic))
+                expanded_nodes += 1  # Increment the expanded nodes counter.
+
+                for move, new_state, new_blank, tile in Puzzle.getPackedSuccessors(current_state, blank, spec=spec):
+                    if new_state not in parents and new_state not in layer:  # Not in this or an earlier beam.
+                        if delta:
+                            heuristic_value = delta(new_state, current_heuristic, tile, new_blank, blank, spec)
+                        else:
+                            heuristic_value = heuristic(Puzzle.unpackBoard(new_state, spec), spec)
+                        layer[new_state] = (heuristic_value, new_blank, current_state, move)
+            max_fringe_size = max(max_fringe_size, len(layer))  # Update max fringe size.
+            if profiler is not None:
+                profiler.generated += len(layer)
+
+            # Keep the most promising states of the layer.
+            beam = []
+            for new_state, (heuristic_value, new_blank, parent, move) in heapq.nsmallest(width, layer.items(), key=lambda item: item[1][0]):
+                parents[new_state] = (parent, move)
+                beam.append((new_state, new_blank, heuristic_value))
+
+        return Search.makeResult(False, [], expanded_nodes, max_fringe_size, timer, cpu_timer,
+                                 closedBytes=parents.nbytes())  # Every path was pruned: unable to find a solution.
+
+Search.zeroHeuristic.delta = Search.zeroHeuristicDelta
+
+# Searches by name, for callers that choose one at run time: name -> (search, whether it takes a heuristic).
+ALGORITHMS = {
+    'astar': (Search.Astar, True),
+    'idastar': (Search.IDAstar, True),
+    'bidirectional-astar': (Search.BidirectionalAstar, True),
+    'weighted-astar': (Search.WeightedAstar, True),
+    'arastar': (Search.ARAstar, True),
+    'beam': (Search.BeamSearch, True),
+    'bfs': (Search.BFS, False),
+    'layer-bfs': (Search.LayerBFS, False),
+    'bidirectional-bfs': (Search.BidirectionalBFS, False),
+    'ucs': (Search.UCS, False),
+    'dfs': (Search.DFS, False),
+}
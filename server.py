@@ -0,0 +1,197 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from puzzle import Puzzle
+from search import Search, ALGORITHMS
+from batch import getHeuristic, getSpec, getCache
+
+KILL_GRACE = 1.0  # Seconds a search may run past its deadline before its worker is killed.
+
+# Workers are not forked from the server, which would hand them copies of its client sockets and
+# keep those connections open after the server closes them.
+_context = multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+def solveRequest(request, cachePath=None):
+    """Solve one request in a worker process and return its response. The
+    request's `timeout` is what is left of its deadline."""
+    response = {'id': request.get('id')}
+    try:
+        spec = getSpec(request['board'])
+        board = Puzzle.validateBoard(request['board'], spec)
+        algorithm = request.get('algorithm', 'astar')
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f'Unknown algorithm {algorithm!r}')
+        heuristicName = request.get('heuristic', 'manhattanDistance')
+        heuristic = getHeuristic(heuristicName, spec) if ALGORITHMS[algorithm][1] else None
+        solve = getCache(cachePath).solve if cachePath else Search.solve
+        response.update(solve(list(board), algorithm, heuristic, request['timeout'], spec)._asdict())
+    except (ValueError, IndexError, KeyError, TypeError, OSError) as exception:
+        response['error'] = f'Cannot solve board: {exception}'
+    return response
+
+def workerMain(connection, cachePath=None):
+    """Solve the requests sent on `connection`, one at a time, until it closes."""
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        connection.send(solveRequest(request, cachePath))
+
+class Worker:
+    """A process that solves one request at a time, sent over a pipe. It can
+    be killed in the middle of a search, unlike a process pool's workers."""
+
+    def __init__(self, cachePath=None):
+        self.connection, child = _context.Pipe()
+        self.process = _context.Process(target=workerMain, args=(child, cachePath), daemon=True)
+        self.process.start()
+        child.close()  # Only the worker keeps its end, so recv() fails once it dies.
+
+    async def solve(self, request):
+        """Send the request and wait for the response without blocking the event loop."""
+        self.connection.send(request)
+        return await asyncio.to_thread(self.connection.recv)
+
+    def kill(self):
+        """Stop the worker at once. The thread still waiting on the pipe gets
+        EOFError and drops the connection, so it is not closed here, where its
+        file descriptor could be reused while that thread still reads it."""
+        self.process.kill()
+        self.process.join()
+
+class SolveServer:
+    """An asyncio server that solves boards on worker processes. Clients send
+    JSON lines and get one JSON line back per request, in completion order:
+
+        {"id": 1, "board": [...], "algorithm": "astar", "heuristic": "linearConflict", "timeout": 5}
+        {"cancel": 1}
+
+    A request's deadline starts when it arrives, so time spent queued counts,
+    and what is left is passed to the search as its timeout. A worker whose
+    request is cancelled, whose client disconnects or that runs KILL_GRACE
+    past the deadline is killed and replaced. At most maxPending requests are
+    queued or running; beyond that requests are answered with a "busy" error
+    straight away, so clients can back off."""
+
+    def __init__(self, workers=None, maxPending=None, timeout=10, cachePath=None):
+        self.workerCount = workers or os.cpu_count() or 1
+        self.maxPending = maxPending or 4 * self.workerCount
+        self.timeout = timeout  # Default seconds allowed per request.
+        self.cachePath = cachePath
+        self.pending = 0  # Requests queued or running.
+        self.idle = None  # Queue of workers waiting for a request, made in the event loop.
+
+    async def start(self):
+        self.idle = asyncio.Queue()
+        for _ in range(self.workerCount):
+            self.idle.put_nowait(Worker(self.cachePath))
+
+    async def solve(self, request):
+        """Run a request on the next idle worker and return its response."""
+        deadline = time.monotonic() + request.get('timeout', self.timeout)
+        worker = await self.idle.get()
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return {'id': request.get('id'), 'error': 'Deadline passed before a worker was free', 'timed_out': True}
+            response = await asyncio.wait_for(worker.solve(dict(request, timeout=remaining)), remaining + KILL_GRACE)
+        except BaseException:  # Cancelled or overran its deadline: the search cannot be interrupted any other way.
+            worker.kill()
+            worker = Worker(self.cachePath)
+            raise
+        finally:
+            self.idle.put_nowait(worker)
+        return response
+
+    async def handleRequest(self, request, writer):
+        """Solve a request and write its response."""
+        try:
+            response = await self.solve(request)
+        except asyncio.TimeoutError:
+            response = {'id': request.get('id'), 'error': 'Worker killed after missing its deadline', 'timed_out': True}
+        except asyncio.CancelledError:
+            response = {'id': request.get('id'), 'cancelled': True}
+        except (EOFError, OSError):
+            response = {'id': request.get('id'), 'error': 'Worker died while solving'}
+        except Exception as exception:  # Any other failure still answers the request.
+            response = {'id': request.get('id'), 'error': f'Cannot solve request: {exception}'}
+        finally:
+            self.pending -= 1
+        if not writer.is_closing():
+            try:
+                writer.write((json.dumps(response) + '\n').encode())
+                await writer.drain()
+            except ConnectionError:
+                pass  # The client went away; its connection handler cleans up.
+
+    async def handleConnection(self, reader, writer):
+        """Read requests from one client until it disconnects, then cancel
+        whatever it still has running."""
+        tasks = {}  # Request id -> task solving it.
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError('a request must be a JSON object')
+                except ValueError as error:
+                    writer.write((json.dumps({'error': f'Cannot parse request: {error}'}) + '\n').encode())
+                    continue
+                if 'cancel' in request:
+                    task = tasks.get(request['cancel'])
+                    if task is not None:
+                        task.cancel()
+                    continue
+                timeout = request.get('timeout', self.timeout)
+                if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not 0 < timeout < float('inf'):
+                    error = f'Invalid timeout {timeout!r}, expected a positive number of seconds'
+                    writer.write((json.dumps({'id': request.get('id'), 'error': error}) + '\n').encode())
+                    continue
+                if self.pending >= self.maxPending:
+                    writer.write((json.dumps({'id': request.get('id'), 'error': 'busy'}) + '\n').encode())
+                    continue
+                self.pending += 1
+                requestId = request.get('id')
+                task = tasks[requestId] = asyncio.create_task(self.handleRequest(request, writer))
+                task.add_done_callback(lambda done, key=requestId: tasks.get(key) is done and tasks.pop(key))
+        except ConnectionError:
+            pass  # The client went away; cancel its work below.
+        finally:
+            for task in list(tasks.values()):
+                task.cancel()
+            writer.close()
+
+    async def serve(self, path=None, host='127.0.0.1', port=8765):
+        """Listen on the Unix socket at `path`, or on TCP host:port, until cancelled."""
+        await self.start()
+        if path:
+            server = await asyncio.start_unix_server(self.handleConnection, path)
+        else:
+            server = await asyncio.start_server(self.handleConnection, host, port)
+        async with server:
+            await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve puzzle solves as JSON lines over a Unix socket or local TCP.')
+    parser.add_argument('-u', '--unix', metavar='PATH', help='Unix socket to listen on (default: TCP).')
+    parser.add_argument('--host', default='127.0.0.1', help='TCP address to listen on (default: 127.0.0.1).')
+    parser.add_argument('-p', '--port', type=int, default=8765, help='TCP port to listen on (default: 8765).')
+    parser.add_argument('-w', '--workers', type=int, help='Worker processes (default: one per CPU).')
+    parser.add_argument('-q', '--max-pending', type=int, help='Requests queued or running before new ones are refused (default: 4 per worker).')
+    parser.add_argument('-t', '--timeout', type=float, default=10, help='Default seconds allowed per request (default: 10).')
+    parser.add_argument('--cache', metavar='FILE', help='SQLite file of solutions to reuse and extend.')
+    args = parser.parse_args(argv)
+    server = SolveServer(args.workers, args.max_pending, args.timeout, args.cache)
+    try:
+        asyncio.run(server.serve(args.unix, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
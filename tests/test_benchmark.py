@@ -0,0 +1,15 @@
+import pytest
+from benchmark import generateInstances, unfilledBuckets, main
+from puzzle import PuzzleSpec
+
+def test_uniform_boards_refuse_shallow_buckets():
+    with pytest.raises(ValueError, match=r'\[5, 10, 15\]'):
+        generateInstances(1, [5, 10, 15, 20, 25, 30], 5, uniform=True)
+
+def test_short_buckets_are_reported(tmp_path, capsys):
+    spec = PuzzleSpec.ofSize(3)
+    instances = generateInstances(1, [2, 4], 2, spec=spec)
+    assert unfilledBuckets(instances, [2, 4], 2) == {}
+    assert unfilledBuckets(instances[:3], [2, 4], 2) == {4: 1}
+    assert main(['generate', '-o', str(tmp_path / 'set.json'), '-S', '3', '-n', '1', '-d', '28,32', '--uniform']) == 1
+    assert 'Bucket 32 holds only 0 of 1' in capsys.readouterr().err
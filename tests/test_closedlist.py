@@ -0,0 +1,61 @@
+import os
+import random
+import pytest
+from closedlist import CompactClosedList, makeClosedList, MOVES
+from puzzle import Puzzle, PuzzleSpec, UP, DOWN
+from search import Search
+
+SPEC = PuzzleSpec.ofSize(4)
+
+def openFileCount():
+    return len(os.listdir('/proc/self/fd'))
+
+def randomEntries(count, seed=1):
+    rng = random.Random(seed)
+    states = rng.sample(range(1, 1 << 40), count)
+    return {state: (rng.choice([0, *states[:10]]) or None, rng.choice(MOVES[1:])) for state in states}
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason='needs /proc to count open files')
+def test_spills_are_merged_and_files_closed():
+    before = openFileCount()
+    closed = CompactClosedList(SPEC, memoryLimit=4000, onMemoryLimit='spill')
+    entries = randomEntries(20000)
+    for state, value in entries.items():
+        closed[state] = value
+    assert len(closed) == len(entries)
+    assert closed.spilledEntries > 19000  # Spilled well over a hundred times.
+    assert len(closed.runs) <= 12  # Merged down to a logarithmic number of runs.
+    assert openFileCount() - before <= len(closed.runs)  # One mapping each, the files themselves closed.
+    for state, value in entries.items():
+        assert state in closed
+        assert closed[state] == value
+    for state in random.Random(2).sample(range(1 << 41, 1 << 42), 1000):
+        assert state not in closed
+    closed.clear()
+    assert openFileCount() == before
+    assert len(closed) == 0
+
+def test_merge_keeps_the_newest_entry():
+    closed = CompactClosedList(SPEC, memoryLimit=4000, onMemoryLimit='spill')
+    closed[12345] = (None, UP)
+    for state in range(1 << 20, (1 << 20) + 300):  # Spill the first entry.
+        closed[state] = (None, UP)
+    assert closed.runs
+    closed[12345] = (7, DOWN)
+    for state in range(1 << 21, (1 << 21) + 3000):  # Spill it again and merge the runs.
+        closed[state] = (None, UP)
+    assert closed[12345] == (7, DOWN)
+    closed.clear()
+
+def test_spill_picks_the_compact_list():
+    assert isinstance(makeClosedList('dict', SPEC, 20000, 'spill'), CompactClosedList)
+    with pytest.raises(ValueError):
+        makeClosedList('dict', PuzzleSpec.ofSize(5), 20000, 'spill')
+
+def test_astar_spills_with_the_default_closed_list(monkeypatch):
+    spills = []
+    spill = CompactClosedList.spill
+    monkeypatch.setattr(CompactClosedList, 'spill', lambda self: spills.append(len(self)) or spill(self))
+    board = [1, 2, 3, 4, 9, 7, 13, 8, 10, 6, 0, 14, 5, 15, 12, 11]
+    result = Search.Astar(board, Puzzle.manhattanDistance, spec=SPEC, memoryLimit=4000, onMemoryLimit='spill')
+    assert spills and result.solved and result.depth == 26
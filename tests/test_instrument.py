@@ -0,0 +1,28 @@
+import json
+from instrument import SearchProfiler
+from puzzle import Puzzle, PuzzleSpec
+from search import Search
+
+SPEC = PuzzleSpec.ofSize(4)
+BOARD = [1, 2, 3, 4, 9, 7, 13, 8, 10, 6, 0, 14, 5, 15, 12, 11]
+
+def profile(algorithm):
+    profiler = SearchProfiler()
+    Search.solve(BOARD, algorithm, Puzzle.linearConflict, spec=SPEC, profiler=profiler)
+    return profiler
+
+def test_idastar_counts_generated_and_has_no_duplicates():
+    profiler = profile('idastar')
+    run = profiler.toJSON()['runs'][0]
+    assert run['generated'] > run['expanded'] > 0
+    assert run['duplicates'] is None
+    json.dumps(profiler.toJSON())
+    counters = [event for event in profiler.chromeTrace()['traceEvents'] if event['ph'] == 'C']
+    assert counters
+    for event in counters:
+        assert None not in event['args'].values()  # Counter tracks only take numbers.
+
+def test_bidirectional_astar_counts_duplicates():
+    run = profile('bidirectional-astar').toJSON()['runs'][0]
+    assert run['generated'] > run['expanded'] > 0
+    assert run['duplicates'] > 0
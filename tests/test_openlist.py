@@ -0,0 +1,30 @@
+from openlist import BucketOpenList, HeapOpenList, makeOpenList
+from puzzle import Puzzle, DEFAULT_SPEC
+from search import Search
+
+BOARD = [1, 2, 3, 4, 5, 6, 11, 7, 9, 10, 15, 0, 13, 14, 12, 8]  # Integral at the start, fractional further on.
+
+def test_default_open_list_with_a_fractional_max():
+    heuristic = Puzzle.maxHeuristic(Puzzle.euclideanDistance, Puzzle.manhattanDistance)
+    assert not Puzzle.isIntegral(heuristic)
+    assert isinstance(makeOpenList('bucket', heuristic(BOARD), Puzzle.isIntegral(heuristic)), HeapOpenList)
+    result = Search.Astar(BOARD, heuristic)
+    assert result.solved and result.depth == Search.Astar(BOARD, Puzzle.manhattanDistance).depth
+
+def test_unmarked_heuristic_that_turns_fractional():
+    combined = Puzzle.maxHeuristic(Puzzle.euclideanDistance, Puzzle.manhattanDistance)
+    def unmarked(board, spec=DEFAULT_SPEC):
+        return combined(board, spec)
+    assert isinstance(unmarked(BOARD), int)
+    result = Search.Astar(BOARD, unmarked)
+    assert result.solved and result.depth == Search.Astar(BOARD, Puzzle.manhattanDistance).depth
+
+def test_bucket_list_moves_to_a_heap():
+    queue = BucketOpenList()
+    queue.push(3, 1, 'a')
+    queue.push(2, 0, 'b')
+    queue.push(2.5, 1, 'c')
+    queue.push(4, 2, 'd')
+    assert len(queue) == 4
+    assert [queue.pop() for _ in range(4)] == [(2, 0, 'b'), (2.5, 1, 'c'), (3, 1, 'a'), (4, 2, 'd')]
+    assert not queue
@@ -0,0 +1,41 @@
+from collections import deque
+import pytest
+import patterndb
+from patterndb import PatternDatabase
+from puzzle import Puzzle, PuzzleSpec
+
+SPEC = PuzzleSpec.ofSize(3)
+
+def exactDistances(spec):
+    """Every solvable board of the spec, mapped to its shortest solution length."""
+    goal = tuple(spec.goal)
+    distances = {goal: 0}
+    queue = deque([goal])
+    while queue:
+        board = queue.popleft()
+        for move in Puzzle.getValidMoves(list(board), None, spec):
+            child = list(board)
+            Puzzle.makeMove(child, move, spec)
+            child = tuple(child)
+            if child not in distances:
+                distances[child] = distances[board] + 1
+                queue.append(child)
+    return distances
+
+@pytest.mark.skipif(patterndb.np is None, reason='compares the NumPy build with the pure Python one')
+def test_layered_build_matches_the_plain_one(monkeypatch):
+    layered = [PatternDatabase.buildTable(group, SPEC) for group in PatternDatabase.defaultPartition(SPEC)]
+    monkeypatch.setattr(patterndb, 'np', None)
+    assert layered == [PatternDatabase.buildTable(group, SPEC) for group in PatternDatabase.defaultPartition(SPEC)]
+
+def test_tables_are_admissible_and_beat_linear_conflict(tmp_path):
+    database = PatternDatabase.build(path=str(tmp_path / 'patterns.pdb'), spec=SPEC)
+    distances = exactDistances(SPEC)
+    total = conflicts = 0
+    for board, distance in distances.items():
+        value = database(list(board))
+        assert value <= distance
+        total += value
+        conflicts += Puzzle.linearConflict(list(board), SPEC)
+    assert total > conflicts
+    database.close()
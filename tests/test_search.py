@@ -0,0 +1,21 @@
+from closedlist import DictClosedList
+from puzzle import Puzzle, PuzzleSpec
+from search import Search
+
+SPEC = PuzzleSpec.ofSize(4)
+BOARD = [1, 2, 3, 4, 9, 7, 13, 8, 10, 6, 0, 14, 5, 15, 12, 11]
+
+def test_arastar_closed_bytes_counts_the_cost_map(monkeypatch):
+    costMaps = []  # (states, bytes) of every cost map counted.
+    costMapBytes = Search.costMapBytes
+    def counted(costs):
+        costMaps.append((list(costs), costMapBytes(costs)))
+        return costMaps[-1][1]
+    monkeypatch.setattr(Search, 'costMapBytes', staticmethod(counted))
+    result = Search.ARAstar(BOARD, Puzzle.linearConflict, spec=SPEC)
+    assert result.solved and costMaps
+    states, costBytes = costMaps[-1]
+    closed = DictClosedList(SPEC)  # Every state reached has a parent as well as a cost.
+    for state in states:
+        closed[state] = (None, None)
+    assert result.closed_bytes == closed.nbytes() + costBytes
@@ -0,0 +1,44 @@
+import asyncio
+import json
+from server import SolveServer
+
+EASY = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 0, 15]
+
+async def exchange(server, requests):
+    """Send raw request lines to a connection of `server` and return one response per line."""
+    listening = await asyncio.start_server(server.handleConnection, '127.0.0.1', 0)
+    port = listening.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(''.join(line + '\n' for line in requests).encode())
+    await writer.drain()
+    responses = [json.loads(await asyncio.wait_for(reader.readline(), 30)) for _ in requests]
+    writer.close()
+    listening.close()
+    return responses
+
+def test_invalid_timeouts_are_answered():
+    async def main():
+        server = SolveServer(workers=1)
+        await server.start()
+        requests = [json.dumps({'id': i, 'board': EASY, 'timeout': timeout})
+                    for i, timeout in enumerate(['abc', None, True, -1, 0])]
+        responses = await exchange(server, requests + ['{"id": "ok", "board": %s, "timeout": 5}' % EASY,
+                                                       '{"id": "inf", "board": %s, "timeout": Infinity}' % EASY])
+        return server, responses
+    server, responses = asyncio.run(main())
+    responses = {response['id']: response for response in responses}  # In completion order.
+    for key in [0, 1, 2, 3, 4, 'inf']:
+        assert responses[key]['error'].startswith('Invalid timeout')
+    assert responses['ok']['solved']
+    assert server.pending == 0
+
+def test_unexpected_errors_are_answered(monkeypatch):
+    async def failing(self, request):
+        raise RuntimeError('boom')
+    monkeypatch.setattr(SolveServer, 'solve', failing)
+    async def main():
+        server = SolveServer(workers=1)
+        return server, await exchange(server, [json.dumps({'id': 7, 'board': EASY})])
+    server, responses = asyncio.run(main())
+    assert responses == [{'id': 7, 'error': 'Cannot solve request: boom'}]
+    assert server.pending == 0
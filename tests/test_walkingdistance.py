@@ -0,0 +1,20 @@
+import random
+from walkingdistance import WalkingDistance
+from puzzle import Puzzle, PuzzleSpec
+
+SPEC = PuzzleSpec.ofSize(3)
+
+def test_delta_matches_a_full_evaluation(tmp_path):
+    heuristic = WalkingDistance.build(str(tmp_path / 'walking.wdb'), SPEC)
+    rng = random.Random(3)
+    board = Puzzle.getNewBoard(SPEC)
+    h = heuristic(board)
+    move = None
+    for _ in range(500):
+        blank = Puzzle.findBlankIndex(board, SPEC)
+        move = rng.choice(Puzzle.getValidMoves(board, move, SPEC))
+        Puzzle.makeMove(board, move, SPEC)
+        newBlank = Puzzle.findBlankIndex(board, SPEC)
+        state = Puzzle.packBoard(board, SPEC)
+        h = heuristic.delta(state, h, board[blank], newBlank, blank, SPEC)
+        assert h == heuristic(board) == heuristic.delta(list(board), int(h), board[blank], newBlank, blank, SPEC)
@@ -0,0 +1,183 @@
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+from puzzle import Puzzle, PuzzleSpec, DEFAULT_SPEC, BLANK
+
+MAGIC = b'PZWDB'  # File signature of a walking distance table.
+FORMAT_VERSION = 1  # Bump when the file layout changes.
+COUNT_BITS = 3  # Bits per tile count in a table key.
+MAX_SIZE = 4  # The table of a 5x5 board is too big to build by breadth-first search.
+
+class WalkingDistanceValue(int):
+    """A walking distance that also carries the row and column summary
+    keys it was looked up with, so a child's value can be found from its
+    parent's by changing one key instead of summing up the board again.
+    The keys are set as its `rows` and `columns` attributes."""
+
+class WalkingDistance:
+    """The walking distance heuristic. Forgetting which tile is which, a
+    board's rows can be summed up by how many tiles of each goal row every
+    row holds. A vertical move takes one tile from a row next to the blank's
+    into the blank's row, so a breadth-first search over these summaries
+    gives the fewest vertical moves any board with that summary needs. The
+    columns bound the horizontal moves in the same way, and the two add up.
+    Both tables are built once and stored in a file."""
+
+    __name__ = 'walkingDistance'  # Searches print the heuristic's name.
+
+    def __init__(self, rowTable, columnTable, spec=DEFAULT_SPEC):
+        self.spec = spec  # The tables only hold for this board size and goal.
+        self.rowTable = rowTable  # Row summary key -> vertical moves.
+        self.columnTable = columnTable  # Column summary key -> horizontal moves.
+        # increments[tile][cell] = what the tile standing on the cell adds to the key of the summary.
+        size = spec.size
+        self.rowIncrements = [[0] * spec.cells for _ in range(spec.cells)]
+        self.columnIncrements = [[0] * spec.cells for _ in range(spec.cells)]
+        for tile in range(spec.cells):
+            if tile == BLANK:
+                continue
+            goalRow, goalColumn = spec.goalCoordinates[tile]
+            for cell in range(spec.cells):
+                row, column = divmod(cell, size)
+                self.rowIncrements[tile][cell] = 1 << (COUNT_BITS * (row * size + goalRow))
+                self.columnIncrements[tile][cell] = 1 << (COUNT_BITS * (column * size + goalColumn))
+
+    def __call__(self, board, spec=None):
+        """Add up the vertical and horizontal walking distances of the board.
+        The tables belong to self.spec, so `spec` is only accepted to match
+        the other heuristics."""
+        if isinstance(board, int):
+            board = Puzzle.unpackBoard(board, self.spec)
+        rows = columns = 0
+        rowIncrements, columnIncrements = self.rowIncrements, self.columnIncrements
+        for cell, tile in enumerate(board):
+            rows += rowIncrements[tile][cell]
+            columns += columnIncrements[tile][cell]
+        value = WalkingDistanceValue(self.rowTable[rows] + self.columnTable[columns])
+        value.rows = rows
+        value.columns = columns
+        return value
+
+    def delta(self, board, h, tile, fromIndex, toIndex, spec=None):
+        """Update the heuristic after moving `tile` from fromIndex to toIndex,
+        in constant time from the summary keys `h` carries: a vertical move
+        only moves the tile to another row of the row summary, and a
+        horizontal one to another column of the column summary. A parent's
+        value without keys is worked out in full."""
+        try:
+            rows, columns = h.rows, h.columns
+        except AttributeError:
+            return self(board)
+        if fromIndex % self.spec.size == toIndex % self.spec.size:
+            increments = self.rowIncrements[tile]
+            rows += increments[toIndex] - increments[fromIndex]
+        else:
+            increments = self.columnIncrements[tile]
+            columns += increments[toIndex] - increments[fromIndex]
+        value = WalkingDistanceValue(self.rowTable[rows] + self.columnTable[columns])
+        value.rows = rows
+        value.columns = columns
+        return value
+
+    @staticmethod
+    def defaultPath(spec=DEFAULT_SPEC):
+        """Return the file the walking distance tables of a spec are stored in."""
+        name = f'walking{spec.size}x{spec.size}'
+        if spec != PuzzleSpec.ofSize(spec.size):
+            name += '-' + '-'.join(str(tile) for tile in spec.goal)  # Tables for an unusual goal.
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), f'{name}.wdb')
+
+    @staticmethod
+    def buildTable(size, blankLine):
+        """Compute the table of every summary reachable from the solved one,
+        in which each line holds the tiles of its own goal line and the
+        blank's goal line is one tile short. Returns a dict of summary key
+        (the count of tiles of goal line g in line l, at bits
+        COUNT_BITS * (l * size + g)) -> fewest moves to the solved summary."""
+        if size > MAX_SIZE:
+            raise ValueError(f'Walking distance tables are only built for boards up to {MAX_SIZE}x{MAX_SIZE}.')
+        countMask = (1 << COUNT_BITS) - 1
+        start = 0
+        for line in range(size):
+            start += (size - (line == blankLine)) << (COUNT_BITS * (line * size + line))
+        table = {start: 0}
+        queue = deque([(start, blankLine)])  # (summary key, line of the blank)
+        while queue:  # While there are summaries to expand.
+            key, blank = queue.popleft()
+            distance = table[key] + 1
+            for line in (blank - 1, blank + 1):  # A tile from a neighbouring line moves into the blank's.
+                if not 0 <= line < size:
+                    continue
+                for goalLine in range(size):
+                    shift = COUNT_BITS * (line * size + goalLine)
+                    if (key >> shift) & countMask:
+                        new_key = key - (1 << shift) + (1 << (COUNT_BITS * (blank * size + goalLine)))
+                        if new_key not in table:
+                            table[new_key] = distance
+                            queue.append((new_key, line))  # The blank takes the tile's place.
+        return table
+
+    @staticmethod
+    def build(path=None, spec=DEFAULT_SPEC):
+        """Build the row and column tables of the spec, write them to `path`
+        and return the loaded heuristic."""
+        path = path or WalkingDistance.defaultPath(spec)
+        blankRow, blankColumn = spec.goalCoordinates[BLANK]
+        # Header: magic, version, board size, the goal, then each table's entry count, keys and distances.
+        header = struct.pack('<5sBB', MAGIC, FORMAT_VERSION, spec.size)
+        header += struct.pack(f'<{spec.cells}B', *spec.goal)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(header)
+            for blankLine in (blankRow, blankColumn):
+                table = WalkingDistance.buildTable(spec.size, blankLine)
+                keys = sorted(table)
+                file.write(struct.pack('<I', len(keys)))
+                file.write(array('Q', keys).tobytes())
+                file.write(bytes(table[key] for key in keys))
+        os.replace(temporary, path)  # Readers never see a half-written file.
+        return WalkingDistance.load(path, spec)
+
+    @staticmethod
+    def load(path=None, spec=None):
+        """Read a walking distance file written by build(). If a spec is
+        given, the file must hold tables for its size and goal."""
+        path = path or WalkingDistance.defaultPath(spec or DEFAULT_SPEC)
+        with open(path, 'rb') as file:
+            data = file.read()
+        magic, version, size = struct.unpack_from('<5sBB', data, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a walking distance file.')
+        if version != FORMAT_VERSION:
+            raise ValueError(f'{path} holds version {version} tables, expected version {FORMAT_VERSION}.')
+        offset = struct.calcsize('<5sBB')
+        fileSpec = PuzzleSpec(size, data[offset:offset + size * size])
+        offset += size * size
+        if spec is not None and spec != fileSpec:
+            raise ValueError(f'{path} holds tables for {fileSpec}, not {spec}.')
+        tables = []
+        for _ in range(2):
+            count, = struct.unpack_from('<I', data, offset)
+            offset += 4
+            keys = array('Q')
+            keys.frombytes(data[offset:offset + 8 * count])
+            offset += 8 * count
+            tables.append(dict(zip(keys, data[offset:offset + count])))
+            offset += count
+        return WalkingDistance(tables[0], tables[1], fileSpec)
+
+    @staticmethod
+    def loadOrBuild(path=None, spec=DEFAULT_SPEC):
+        """Load the walking distance tables of a spec, building them first if needed."""
+        path = path or WalkingDistance.defaultPath(spec)
+        if not os.path.exists(path):
+            return WalkingDistance.build(path, spec)
+        return WalkingDistance.load(path, spec)
+
+if __name__ == "__main__":
+    # Build the walking distance tables: python walkingdistance.py [path [size]]
+    spec = PuzzleSpec.ofSize(int(sys.argv[2])) if len(sys.argv) > 2 else DEFAULT_SPEC
+    heuristic = WalkingDistance.build(sys.argv[1] if len(sys.argv) > 1 else None, spec)
+    print('Built', len(heuristic.rowTable), 'row and', len(heuristic.columnTable), 'column summaries.')